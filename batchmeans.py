@@ -0,0 +1,123 @@
+from counter import SequentialEstimate
+from stopping import PeriodEstimator
+
+
+class BatchMeans(PeriodEstimator):
+    """
+    Collects batch means during a single long simulation run.
+
+    The run is divided into consecutive batches of batch_size served packets. Per batch, only a few sums are
+    accumulated (see PeriodEstimator), so the model state is never reset between batches. At the end of a batch, the batch
+    means of the metrics are added to running estimates, and the run is stopped as soon as the confidence intervals
+    of all requested metrics meet their precision.
+
+    If grow is set, at most 2 * num_batches batches are kept. When this number is reached, adjacent batches are
+    merged and the batch size is doubled, so that the batch means become less correlated as the run gets longer.
+    max_batches refers to batches of the initial size, i.e., the run is stopped after max_batches * batch_size served
+    packets, regardless of merging.
+    """
+
+    # name of the estimates in error messages
+    estimate_type = 'batch means'
+
+    def __init__(self, sim, batch_size, absolute=None, relative=None, alpha=None, min_batches=10, max_batches=100000,
+                 grow=False, num_batches=20):
+        """
+        Initialize the collector.
+        :param sim: the simulation, whose run is divided into batches
+        :param batch_size: number of served packets per batch (initial size, if grow is set)
+        :param absolute: dictionary of absolute precisions per metric,
+        default: {'blocking_probability': sim_param.EPSILON} if relative is not given either
+        :param relative: dictionary of relative precisions per metric, e.g., {'mean_waiting_time': .05}
+        :param alpha: significance level of the confidence intervals (default: sim_param.ALPHA)
+        :param min_batches: minimum number of batches before the precision is checked
+        :param max_batches: the run is stopped after this number of batches of the initial size, even if the
+        precision is not met
+        :param grow: if True, the batch size is doubled whenever 2 * num_batches batches are completed
+        :param num_batches: number of batches after merging, only used if grow is set
+        """
+        self.init_rule(sim.sim_param, absolute, relative, alpha)
+        self.sim = sim
+        self.batch_size = batch_size
+        self.initial_batch_size = batch_size
+        self.served_total = 0  # served packets of all completed batches, not reset by merging
+        self.min_batches = max(2, min_batches)
+        self.max_batches = max_batches
+        self.grow = grow
+        self.num_batches = num_batches
+        self.batches = []  # sums of every completed batch, only kept if grow is set
+        self.estimates = {}
+        for name in self.metrics:
+            self.estimates[name] = SequentialEstimate(name=name)
+        self.start_period()
+
+    def count_packet(self, wt):
+        """
+        Count the waiting time of a served packet and close the batch, if it is full.
+        Called by CounterCollection.count_packet after a service completion.
+        """
+        super(BatchMeans, self).count_packet(wt)
+        if self.served >= self.batch_size:
+            self.complete_batch()
+
+    def complete_batch(self):
+        """
+        Add the means of the current batch to the estimates, check the stopping rule and start the next batch.
+        """
+        sim_state = self.sim.sim_state
+        batch = (sim_state.num_packets - self.start_packets, sim_state.num_blocked_packets - self.start_blocked,
+                 self.served, self.sum_wt, sim_state.now - self.start_time, self.area_ql, self.area_busy)
+        self.add_batch(batch)
+        self.served_total += self.served
+        if self.grow:
+            self.batches.append(batch)
+            if len(self.batches) >= 2 * self.num_batches:
+                self.merge_batches()
+        if self.is_done():
+            sim_state.stop = True
+        self.start_period()
+
+    def add_batch(self, batch):
+        """
+        Add the means of a batch to the running estimates.
+        :param batch: tuple of the sums of a batch (see complete_batch)
+        """
+        packets, blocked, served, sum_wt, duration, area_ql, area_busy = batch
+        self.estimates['blocking_probability'].count(blocked / packets if packets > 0 else 0.)
+        self.estimates['mean_waiting_time'].count(sum_wt / served if served > 0 else 0.)
+        self.estimates['system_utilization'].count(area_busy / duration if duration > 0 else 0.)
+        self.estimates['mean_queue_length'].count(area_ql / duration if duration > 0 else 0.)
+
+    def merge_batches(self):
+        """
+        Merge pairs of adjacent batches, double the batch size and recompute the estimates.
+        """
+        self.batches = [tuple(a + b for a, b in zip(self.batches[i], self.batches[i + 1]))
+                        for i in range(0, len(self.batches) - 1, 2)]
+        self.batch_size *= 2
+        for name in self.metrics:
+            self.estimates[name] = SequentialEstimate(name=name)
+        for batch in self.batches:
+            self.add_batch(batch)
+
+    def get_num_batches(self):
+        """
+        :return: number of completed batches (of the current batch size)
+        """
+        return self.estimates['blocking_probability'].n
+
+    def is_done(self):
+        """
+        Check the stopping rule.
+        :return: true, if all requested metrics meet their precision or max_batches is reached
+        """
+        if self.served_total >= self.max_batches * self.initial_batch_size:
+            return True
+        return self.is_met(self.get_num_batches(), self.min_batches, self.max_batches)
+
+    def report(self):
+        """
+        Print the batch means and their confidence intervals.
+        """
+        self.report_estimates('Batch means: ' + str(self.get_num_batches()) + ' batches of ' + str(self.batch_size) +
+                              ' packets')
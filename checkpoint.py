@@ -0,0 +1,103 @@
+import os
+import pickle
+import time
+
+
+def snapshot(sim):
+    """
+    Serialize the full state of a simulation: event chain, SimState, SystemState with the queued packets, RNG streams,
+    counters and the object pool.
+    :param sim: simulation object
+    :return: bytes in the binary pickle format
+    """
+    return pickle.dumps(sim, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def restore(data):
+    """
+    Recreate a simulation from a snapshot.
+    :param data: bytes as returned by snapshot
+    :return: simulation object, that continues exactly where the snapshot was taken
+    """
+    return pickle.loads(data)
+
+
+def save_checkpoint(sim, path):
+    """
+    Write a snapshot of the simulation to a file. The snapshot is written to a temporary file first and renamed
+    afterwards, so that an existing checkpoint is never left half written if the process gets killed.
+    :param sim: simulation object
+    :param path: path of the checkpoint file
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(snapshot(sim))
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """
+    Load a simulation from a checkpoint file.
+    :param path: path of the checkpoint file
+    :return: simulation object
+    """
+    with open(path, 'rb') as f:
+        return restore(f.read())
+
+
+def resume_simulation(path, **kwargs):
+    """
+    Load a simulation from a checkpoint file and continue its run.
+    Runs of do_simulation stop at the termination event, which is part of the checkpoint. Other stop conditions
+    (e.g. the remaining number of served packets) have to be passed again.
+    :param path: path of the checkpoint file
+    :param kwargs: stop conditions for Simulation.run, e.g., predicate=Checkpointer(path, every_events=10 ** 6)
+    :return: SimResult object
+    """
+    return load_checkpoint(path).run(**kwargs)
+
+
+class Checkpointer(object):
+    """
+    Writes checkpoints of a running simulation periodically, every N events and/or every T wall-clock seconds.
+
+    A Checkpointer is passed as predicate to Simulation.run (or as checkpointer to Simulation.do_simulation). It is
+    called after every event and never stops the simulation. A run, that is resumed from a checkpoint, produces
+    bit-identical results to an uninterrupted run, except for the wall-clock based fields (event_throughput).
+    """
+
+    def __init__(self, path, every_events=None, every_seconds=None):
+        """
+        Initialize the checkpointer.
+        :param path: path of the checkpoint file, which is overwritten by every checkpoint
+        :param every_events: write a checkpoint after every every_events events
+        :param every_seconds: write a checkpoint after every every_seconds seconds of wall-clock time
+        """
+        self.path = path
+        self.every_events = every_events
+        self.every_seconds = every_seconds
+        self.num_events = 0
+        self.num_checkpoints = 0
+        self.last_time = time.perf_counter()
+
+    def __call__(self, sim):
+        """
+        Count an event and write a checkpoint, if one is due.
+        :param sim: the running simulation
+        :return: False, the simulation is never stopped
+        """
+        self.num_events += 1
+        if self.every_events is not None and self.num_events % self.every_events == 0:
+            self.write(sim)
+        elif self.every_seconds is not None and time.perf_counter() - self.last_time >= self.every_seconds:
+            self.write(sim)
+        return False
+
+    def write(self, sim):
+        """
+        Write a checkpoint of the simulation.
+        :param sim: the running simulation
+        """
+        save_checkpoint(sim, self.path)
+        self.num_checkpoints += 1
+        self.last_time = time.perf_counter()
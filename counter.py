@@ -1,6 +1,5 @@
 import numpy as np
 from scipy.stats import t, skew
-from collections import deque
 
 
 class Counter(object):
@@ -20,6 +19,7 @@ class Counter(object):
         """
         self.name = name
         self.values = []
+        self.n = 0  # number of counted values
 
     def count(self, *args):
         """
@@ -33,6 +33,7 @@ class Counter(object):
         Delete all values stored in internal array.
         """
         self.values = []
+        self.n = 0
 
     def get_mean(self):
         """
@@ -59,7 +60,7 @@ class Counter(object):
         """
         Print report for this counter.
         """
-        if len(self.values) != 0:
+        if self.n != 0:
             print('Name: ' + str(self.name) + ', Mean: ' + str(self.get_mean()) + ', Variance: ' + str(self.get_var()))
         else:
             print('List for creating report is empty. Please check.')
@@ -69,54 +70,105 @@ class TimeIndependentCounter(Counter):
     """
     Counter for counting values independent of their duration.
 
+    The counter is streaming: count, mean and the sum of squared deviations M2 are updated incrementally (Welford), so
+    that the memory is constant and mean, variance and confidence interval are available in O(1). The third central
+    moment for get_skewness is only updated if higher_moments is set. The raw values are only kept in the internal
+    array if keep_values is set, which is needed for bootstrapping, histograms and the correlation subclasses.
+
     As an extension, the class can report a confidence interval and check if a value lies within this interval.
     """
 
-    def __init__(self, name="default"):
+    def __init__(self, name="default", seed=None, keep_values=False, higher_moments=False):
         """
         Initialize the TIC object.
+        :param seed: optional seed of the random generator of the counter, which is used for bootstrapping
+        :param keep_values: if True, all values are kept in the internal array
+        :param higher_moments: if True, the third central moment is updated as well (for get_skewness)
         """
         super(TimeIndependentCounter, self).__init__(name)
+        self.seed = seed
+        self.rng = None  # own random generator for bootstrapping, created on first use
+        self.keep_values = keep_values
+        self.higher_moments = higher_moments
+        self.reset()
+
+    def reset(self, *args):
+        """
+        Delete all values stored in internal array and reset the moments.
+        """
+        Counter.reset(self)
+        self.sum = 0.  # running sum of the values, the mean is sum / n
+        self.mean = 0.  # running mean of Welford's algorithm, only used for updating m2 and m3
+        self.m2 = 0.
+        self.m3 = 0.
 
     def count(self, *args):
         """
-        Add a new value to the internal array. Parameters are chosen as *args because of the inheritance to the
-        correlation counters.
+        Add a new value to the moments (and to the internal array, if keep_values is set). Parameters are chosen as
+        *args because of the inheritance to the correlation counters.
         :param: *args is the value that should be added to the internal array
         """
-        self.values.append(args[0])
+        x = args[0]
+        if self.keep_values:
+            self.values.append(x)
+        self.sum += x
+        n = self.n + 1
+        delta = x - self.mean
+        delta_n = delta / n
+        term = delta * delta_n * self.n
+        if self.higher_moments:
+            self.m3 += term * delta_n * (n - 2) - 3 * delta_n * self.m2
+        self.mean += delta_n
+        self.m2 += term
+        self.n = n
 
     def get_mean(self):
         """
-        Return the mean value of the internal array.
+        Return the mean value of all counted values.
         """
-        if len(self.values) <= 0:
+        if self.n <= 0:
             raise RuntimeError("No values stored in the counter. Abort.")
         else:
-            return np.mean(self.values)
+            return self.sum / self.n
 
     def get_var(self):
         """
-        Return the variance of the internal array.
+        Return the variance of all counted values.
         Note, that we take the estimated variance, not the exact variance.
         """
-        if len(self.values) <= 0:
+        if self.n <= 0:
             raise RuntimeError("No values stored in the counter. Abort.")
+        elif self.n == 1:
+            return np.nan
         else:
-            return np.var(self.values, ddof=1)
+            return self.m2 / (self.n - 1)
 
     def get_stddev(self):
         """
-        Return the standard deviation of the internal array.
+        Return the standard deviation of all counted values.
         """
-        return np.std(self.values, ddof=1)
+        return np.sqrt(self.get_var())
 
     def get_skewness(self):
         """
         :return: the sample skewness of a data set.
         """
+        if self.higher_moments:
+            if self.m2 == 0:
+                return np.nan
+            return np.sqrt(self.n) * self.m3 / self.m2 ** 1.5
+        if not self.keep_values:
+            raise RuntimeError("The skewness requires higher_moments or keep_values. Abort.")
         return skew(self.values)
 
+    def get_values(self):
+        """
+        Return the internal array of all counted values.
+        """
+        if not self.keep_values:
+            raise RuntimeError("The values are not kept, create the counter with keep_values=True. Abort.")
+        return self.values
+
     def report_confidence_interval(self, alpha=0.05, print_report=True):
         """
         Report a confidence interval with given significance level.
@@ -126,8 +178,8 @@ class TimeIndependentCounter(Counter):
         :return: half width of confidence interval h
         """
         if (alpha >= 0 and alpha <= 1):
-            variance = np.sqrt(self.get_var() / len(self.values))
-            t_alpha_half = t.ppf(float(1 - (alpha / 2)), len(self.values) - 1)
+            variance = np.sqrt(self.get_var() / self.n)
+            t_alpha_half = t.ppf(float(1 - (alpha / 2)), self.n - 1)
             interval = variance * t_alpha_half
             if print_report:
                 print(f'The half width of confidence interval is: {interval}')
@@ -152,15 +204,19 @@ class TimeIndependentCounter(Counter):
     def report_bootstrap_confidence_interval(self, alpha=0.05, resample_size=5000, print_report=True):
         """
         Report bootstrapping confidence interval with given significance level.
-        This is done with the bootstrap method. Hint: use numpy.random.choice for resampling
+        This is done with the bootstrap method. The samples are drawn with the random generator of the counter, not
+        with the global numpy random state. The values have to be kept (keep_values).
         :param alpha: significance level
         :param resample_size: resampling size
         :param print_report: enables an output string
         :return: lower and upper bound of confidence interval
         """
+        values = self.get_values()
+        if self.rng is None:
+            self.rng = np.random.default_rng(self.seed)
         deltas = []
         for i in range(resample_size):
-            samples = np.random.choice(self.values, len(self.values), replace=True)
+            samples = self.rng.choice(values, len(values), replace=True)
             deltas.append(np.mean(samples) - self.get_mean())
         sorted_deltas = sorted(deltas)
 
@@ -187,10 +243,119 @@ class TimeIndependentCounter(Counter):
             return False
 
 
+class SequentialEstimate(TimeIndependentCounter):
+    """
+    Running estimate of the mean of a metric over replications or batches.
+
+    The estimate is a streaming TimeIndependentCounter, that does not keep the values, so that checking the confidence
+    interval after every replication is O(1). In contrast to the counter, mean, variance and half width are defined
+    for less than two values, so that a stopping rule can be checked at any time.
+    """
+
+    def __init__(self, name="default"):
+        """
+        Initialize the estimate.
+        :param name: name of the metric, e.g., mean_waiting_time
+        """
+        super(SequentialEstimate, self).__init__(name)
+
+    def get_mean(self):
+        """
+        :return: the mean of all counted values, or 0 if no value is counted
+        """
+        if self.n == 0:
+            return 0.
+        return super(SequentialEstimate, self).get_mean()
+
+    def get_var(self):
+        """
+        :return: the sample variance of all counted values, or 0 if less than two values are counted
+        """
+        if self.n < 2:
+            return 0.
+        return super(SequentialEstimate, self).get_var()
+
+    def get_half_width(self, alpha):
+        """
+        Return the half width of the confidence interval of the mean (t-distribution).
+        :param alpha: significance level
+        :return: half width, or infinity if less than two values are counted
+        """
+        if self.n < 2:
+            return np.inf
+        return self.report_confidence_interval(alpha, print_report=False)
+
+
+class RatioEstimate(object):
+    """
+    Running ratio estimate sum(y) / sum(x) of i.i.d. pairs (y, x), e.g., of regeneration cycles.
+
+    The moments of x, y and x + y are counted by streaming TimeIndependentCounters, so the memory is constant. The
+    covariance of x and y follows from their variances and the variance of x + y. The confidence interval of the
+    ratio r is based on the variance of y - r * x (classical regenerative method).
+    """
+
+    def __init__(self, name="default"):
+        """
+        Initialize the estimate.
+        :param name: name of the estimated ratio, e.g., mean_waiting_time
+        """
+        self.name = name
+        self.n = 0
+        self.cnt_x = TimeIndependentCounter(name + '_x')
+        self.cnt_y = TimeIndependentCounter(name + '_y')
+        self.cnt_sum = TimeIndependentCounter(name + '_sum')
+
+    def count(self, y, x):
+        """
+        Add a pair of values.
+        :param y: numerator of the pair (e.g., sum of waiting times of a cycle)
+        :param x: denominator of the pair (e.g., number of served packets of a cycle)
+        """
+        self.n += 1
+        self.cnt_x.count(x)
+        self.cnt_y.count(y)
+        self.cnt_sum.count(x + y)
+
+    def get_ratio(self):
+        """
+        :return: the ratio estimate sum(y) / sum(x), or 0 if sum(x) is 0
+        """
+        if self.cnt_x.sum == 0:
+            return 0.
+        return self.cnt_y.sum / self.cnt_x.sum
+
+    def get_mean(self):
+        """
+        :return: the ratio estimate (same as get_ratio)
+        """
+        return self.get_ratio()
+
+    def get_half_width(self, alpha):
+        """
+        Return the half width of the confidence interval of the ratio.
+        :param alpha: significance level
+        :return: half width, or infinity if less than two pairs are counted
+        """
+        if self.n < 2 or self.cnt_x.sum == 0:
+            return np.inf
+        r = self.get_ratio()
+        c_xx = self.cnt_x.m2
+        c_yy = self.cnt_y.m2
+        c_xy = (self.cnt_sum.m2 - c_xx - c_yy) / 2
+        var = max(c_yy - 2 * r * c_xy + r * r * c_xx, 0.) / (self.n - 1)
+        return np.sqrt(var / self.n) / abs(self.cnt_x.get_mean()) * t.ppf(1 - alpha / 2, self.n - 1)
+
+
 class TimeDependentCounter(Counter):
     """
     Counter, that counts values considering their duration as well.
 
+    The counter does not keep the values. Consecutive equal values are merged into a segment, e.g., the server status
+    stays busy for many events. The time integrals of the value and of its square are only updated, when a segment
+    ends, and are accumulated as running sums with Kahan compensation, so that the memory is constant and the rounding
+    error does not grow with the number of events. Additionally, the minimum and maximum of the counted values are
+    tracked.
     Methods for calculating mean, variance and standard deviation are available.
     """
 
@@ -204,36 +369,100 @@ class TimeDependentCounter(Counter):
         self.sim = sim
         self.first_timestamp = 0
         self.last_timestamp = 0
-        self.sum_power_two = []  # second moment used for variance calculation
+        self.clear()
 
-    def count(self, value):
+    def clear(self):
         """
-        Adds new value to internal array.
-        Duration from last to current value is considered.
+        Clear the running sums, the minimum and the maximum.
         """
+        # running sums of the first and second moment and their compensations (Kahan summation)
+        self.area = 0.
+        self.area_c = 0.
+        self.area_power_two = 0.
+        self.area_power_two_c = 0.
+        self.min = np.inf
+        self.max = -np.inf
+        # value of the current segment, which lasts from segment_start to last_timestamp
+        self.value = None
+        self.segment_start = self.last_timestamp
 
-        dt = self.sim.sim_state.now - self.last_timestamp
-        if dt < 0:
+    def count(self, value):
+        """
+        Adds the new value, weighted with the duration from the last to the current value, to the running sums.
+        """
+        now = self.sim.sim_state.now
+        last_timestamp = self.last_timestamp
+        if now < last_timestamp:
             print('Error in calculating time dependent statistics. Current time is smaller than last timestamp.')
             raise ValueError
-        # Second moment
-        self.sum_power_two.append(value * value * dt)
-        # First moment
-        self.values.append(value * dt)
-        self.last_timestamp = self.sim.sim_state.now
+        if value != self.value:
+            self.end_segment()
+            self.value = value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+        self.n += 1
+        self.last_timestamp = now
+
+    def end_segment(self):
+        """
+        Add the current segment to the running sums. A new segment with the same value starts at the last timestamp.
+        """
+        value = self.value
+        if value is not None:
+            # First moment
+            value_dt = value * (self.last_timestamp - self.segment_start)
+            area = self.area
+            y = value_dt - self.area_c
+            total = area + y
+            self.area_c = (total - area) - y
+            self.area = total
+            # Second moment
+            area = self.area_power_two
+            y = value * value_dt - self.area_power_two_c
+            total = area + y
+            self.area_power_two_c = (total - area) - y
+            self.area_power_two = total
+        self.segment_start = self.last_timestamp
+
+    def get_area(self):
+        """
+        Return the time integral of the counted values.
+        """
+        self.end_segment()
+        return self.area - self.area_c
+
+    def get_total_time(self):
+        """
+        Return the duration, over which the values are counted.
+        """
+        return self.last_timestamp - self.first_timestamp
+
+    def get_min(self):
+        """
+        Return the smallest counted value, or None if no value is counted.
+        """
+        return self.min if self.n > 0 else None
+
+    def get_max(self):
+        """
+        Return the largest counted value, or None if no value is counted.
+        """
+        return self.max if self.n > 0 else None
 
     def get_mean(self):
         """
         Return the mean value of the counter, normalized by the total duration of the simulation.
         """
-        return float(sum(self.values)) / float((self.last_timestamp - self.first_timestamp))
+        return float(self.get_area()) / float(self.get_total_time())
 
     def get_var(self):
         """
         Return the variance of the TDC.
         """
-        dt = self.last_timestamp - self.first_timestamp
-        return float(sum(self.sum_power_two)) / float(dt) - self.get_mean() * self.get_mean()
+        mean = self.get_mean()  # ends the current segment as well
+        return float(self.area_power_two - self.area_power_two_c) / float(self.get_total_time()) - mean * mean
 
     def get_stddev(self):
         """
@@ -247,7 +476,7 @@ class TimeDependentCounter(Counter):
         """
         self.first_timestamp = self.sim.sim_state.now
         self.last_timestamp = self.sim.sim_state.now
-        self.sum_power_two = []
+        self.clear()
         Counter.reset(self)
 
 
@@ -256,12 +485,13 @@ class TimeIndependentCrosscorrelationCounter(TimeIndependentCounter):
     Counter that is able to calculate cross correlation (and covariance).
     """
 
-    def __init__(self, name="default"):
+    def __init__(self, name="default", seed=None):
         """
         Crosscorrelation counter contains three internal counters containing the variables
         :param name: is a string for better distinction between counters.
+        :param seed: optional seed of the random generator for bootstrapping
         """
-        super(TimeIndependentCrosscorrelationCounter, self).__init__(name)
+        super(TimeIndependentCrosscorrelationCounter, self).__init__(name, seed, keep_values=True)
         self.values2 = []
         self.prod = []
 
@@ -277,7 +507,7 @@ class TimeIndependentCrosscorrelationCounter(TimeIndependentCounter):
         """
         Count two values for the correlation between them. They are added to the two internal arrays.
         """
-        self.values.append(x)
+        TimeIndependentCounter.count(self, x)
         self.values2.append(y)
         self.prod.append(x * y)
 
@@ -304,18 +534,88 @@ class TimeIndependentCrosscorrelationCounter(TimeIndependentCounter):
         print('Name: ' + self.name + '; covariance = ' + str(self.get_cov()) + '; correlation = ' + str(self.get_cor()))
 
 
-class TimeIndependentAutocorrelationCounter(TimeIndependentCounter):
+class AutocorrelationMixin(object):
+    """
+    Mixin for auto correlation counters, that derives the auto correlations and the report from the auto covariances.
+
+    Subclasses implement autocovariance(max_lag, circular), which returns the auto covariances of the lags 0 to
+    max_lag at once.
+    """
+
+    def autocorrelation(self, max_lag=None, circular=False):
+        """
+        Calculate the auto correlations for all lags up to max_lag at once.
+        For circular shifts, the auto covariances are divided by the sample variance as in get_auto_cor, otherwise by
+        the auto covariance of lag 0.
+        :param max_lag: largest lag (default: the maximum lag of the counter)
+        :param circular: if True, the series is shifted circularly as in get_auto_cor
+        :return: numpy array of the auto correlations of the lags 0 to max_lag, nan if the variance is 0 or not defined
+        """
+        cov = self.autocovariance(max_lag, circular)
+        if circular and self.n < 2:
+            # the sample variance of a single value is not defined
+            return np.full(len(cov), np.nan)
+        var = cov[0] * self.n / (self.n - 1) if circular else cov[0]
+        if var == 0:
+            return np.full(len(cov), np.nan)
+        return cov / var
+
+    def get_auto_cov(self, lag):
+        """
+        Calculate the auto covariance for a given lag, the series is shifted circularly. Hence, the lags -lag, lag and
+        N - lag have the same auto covariance.
+        :return: auto covariance
+        """
+        lag = abs(lag)
+        return self.autocovariance(lag, circular=True)[lag % self.n]
+
+    def get_auto_cor(self, lag):
+        """
+        Calculate the auto correlation for a given lag, the series is shifted circularly.
+        :return: auto correlation, nan if the variance is 0 or if only one value is counted
+        """
+        if self.n == 1:
+            # the sample variance of a single value is not defined
+            return np.nan
+        var = self.get_auto_cov(0) * self.n / (self.n - 1)
+        if var == 0:
+            return np.nan
+        return self.get_auto_cov(lag) / var
+
+    def set_max_lag(self, max_lag):
+        """
+        Change maximum lag, i.e., the largest lag, that is calculated by autocovariance and reported.
+        """
+        self.max_lag = max_lag
+
+    def report(self):
+        """
+        Print report for auto correlation counter.
+        """
+        print('Name: ' + self.name)
+        cov = self.autocovariance(circular=True)
+        cor = self.autocorrelation(circular=True)
+        for i in range(len(cov)):
+            print('Lag = ' + str(i) + '; covariance = ' + str(cov[i]) + '; correlation = ' + str(cor[i]))
+
+
+class TimeIndependentAutocorrelationCounter(AutocorrelationMixin, TimeIndependentCounter):
     """
     Counter, that is able to calculate auto correlation with given lag.
+
+    The auto covariances of all lags are computed at once with an FFT and cached until new values are counted, so that
+    reporting many lags costs a single O(N log N) pass. get_auto_cov and get_auto_cor shift the series circularly, the
+    methods autocovariance and autocorrelation use only the overlapping pairs by default.
     """
 
-    def __init__(self, name="default", max_lag=10):
+    def __init__(self, name="default", max_lag=10, seed=None):
         """
         Create a new auto correlation counter object.
         :param name: string for better distinction between multiple counters
         :param max_lag: maximum available lag (defaults to 10)
+        :param seed: optional seed of the random generator for bootstrapping
         """
-        super(TimeIndependentAutocorrelationCounter, self).__init__(name)
+        super(TimeIndependentAutocorrelationCounter, self).__init__(name, seed, keep_values=True)
         self.max_lag = max_lag
 
     def reset(self):
@@ -324,48 +624,331 @@ class TimeIndependentAutocorrelationCounter(TimeIndependentCounter):
         """
         TimeIndependentCounter.reset(self)
         self.max_lag = 10
+        self.cache = {}  # auto covariances of all lags per circular flag, valid for cache_n values
+        self.cache_n = 0
 
     def count(self, x):
         """
         Add new element x to counter.
         """
-        self.values.append(x)
+        TimeIndependentCounter.count(self, x)
 
-    def get_auto_cov(self, lag):
+    def get_autocovariances(self, circular):
         """
-        Calculate the auto covariance for a given lag.
-        :return: auto covariance
+        Return the auto covariances of all lags 0 to N - 1 of the N counted values. They are computed with an FFT of
+        the centered series and cached until new values are counted.
+        :param circular: if True, the series is shifted circularly, i.e., its end is continued by its beginning.
+        Otherwise, the series is zero padded, so that only the N - lag overlapping pairs contribute.
+        In both cases, the sum of products is divided by N.
+        :return: numpy array of length N
         """
-        shift = deque(self.values)
-        shift.rotate(lag)
-        prod = [x * y for x, y in zip(self.values, list(shift))]
-        return np.mean(prod) - np.mean(self.values) * np.mean(list(shift))
+        if self.n <= 0:
+            raise RuntimeError("No values stored in the counter. Abort.")
+        if self.cache_n != self.n:
+            self.cache = {}
+            self.cache_n = self.n
+        if circular not in self.cache:
+            x = np.asarray(self.values, dtype=float)
+            x = x - x.mean()
+            n = len(x)
+            size = n if circular else 1 << (2 * n - 1).bit_length()
+            f = np.fft.rfft(x, size)
+            self.cache[circular] = np.fft.irfft(f.real * f.real + f.imag * f.imag, size)[:n] / n
+        return self.cache[circular]
+
+    def autocovariance(self, max_lag=None, circular=False):
+        """
+        Calculate the auto covariances for all lags up to max_lag at once.
+        :param max_lag: largest lag (default: the maximum lag of the counter)
+        :param circular: if True, the series is shifted circularly as in get_auto_cov
+        :return: numpy array of the auto covariances of the lags 0 to max_lag
+        """
+        max_lag = self.max_lag if max_lag is None else max_lag
+        return self.get_autocovariances(circular)[:max_lag + 1]
+
+
+class StreamingAutocorrelationCounter(AutocorrelationMixin, TimeIndependentCounter):
+    """
+    Counter, that calculates the auto correlation of the lags 0 to max_lag with bounded memory.
+
+    Instead of the whole series, the counter keeps the first max_lag values, the last max_lag values and the running
+    sums of the lagged products x_i * x_{i - k}. The values are shifted by the first value to reduce cancellation. New
+    values are collected in a block of block_size values, which is added to the lagged sums with one matrix product,
+    hence the work per value is O(max_lag) and the memory is O(max_lag + block_size), independent of the number of
+    values. The results are the same as for TimeIndependentAutocorrelationCounter (up to rounding) for all lags up
+    to max_lag, both with and without circular shift.
+    """
 
-    def get_auto_cor(self, lag):
+    def __init__(self, name="default", max_lag=10, block_size=1024):
         """
-        Calculate the auto correlation for a given lag.
-        :return: auto correlation
+        Create a new streaming auto correlation counter object.
+        :param name: string for better distinction between multiple counters
+        :param max_lag: maximum available lag (defaults to 10)
+        :param block_size: number of values, that are collected before the lagged sums are updated
         """
-        shift = deque(self.values)
-        shift.rotate(lag)
-        var_x = np.var(self.values, ddof=1)
-        var_y = np.var(list(shift), ddof=1)
-        if (var_x != 0.0 and var_y != 0.0):
-            return self.get_auto_cov(lag) / np.sqrt(var_x * var_y)
-        else:
-            print(f'Warning, the variance is var_x = {var_x}, var_y = {var_y}')
+        self.max_lag = max_lag
+        self.block_size = block_size
+        super(StreamingAutocorrelationCounter, self).__init__(name)
+
+    def reset(self):
+        """
+        Reset the counter to its original state. The maximum lag is kept.
+        """
+        TimeIndependentCounter.reset(self)
+        self.shift = None  # first value, all other values are stored and summed relative to it
+        self.pending = []  # shifted values, which are not yet added to the lagged sums
+        self.head = []  # first max_lag shifted values
+        self.tail = np.zeros(self.max_lag)  # last max_lag shifted values in chronological order, zero if missing
+        self.shifted_sum = 0.
+        self.lagged_sums = np.zeros(self.max_lag + 1)  # sum of x_i * x_{i - k} of the shifted values for every lag k
+
+    def count(self, x):
+        """
+        Add new element x to counter.
+        Mean and variance are taken from the shifted sums as well, hence the moments of TimeIndependentCounter are not
+        updated per value.
+        """
+        self.n += 1
+        if self.shift is None:
+            self.shift = x
+        pending = self.pending
+        pending.append(x - self.shift)
+        if len(pending) >= self.block_size:
+            self.flush()
+
+    def get_mean(self):
+        """
+        Return the mean value of all counted values.
+        """
+        if self.n <= 0:
+            raise RuntimeError("No values stored in the counter. Abort.")
+        self.flush()
+        return self.shift + self.shifted_sum / self.n
+
+    def get_var(self):
+        """
+        Return the variance of all counted values.
+        Note, that we take the estimated variance, not the exact variance.
+        """
+        if self.n <= 0:
+            raise RuntimeError("No values stored in the counter. Abort.")
+        elif self.n == 1:
+            return np.nan
+        self.flush()
+        return max(self.lagged_sums[0] - self.shifted_sum * self.shifted_sum / self.n, 0.) / (self.n - 1)
+
+    def flush(self):
+        """
+        Add the pending values to the lagged sums.
+        """
+        if not self.pending:
+            return
+        block = np.array(self.pending, dtype=float)
+        self.pending = []
+        if len(self.head) < self.max_lag:
+            self.head.extend(block[:self.max_lag - len(self.head)].tolist())
+        self.shifted_sum += block.sum()
+        # row j of the windows holds the max_lag values before block[j] and block[j] itself
+        extended = np.concatenate((self.tail, block))
+        windows = np.lib.stride_tricks.sliding_window_view(extended, self.max_lag + 1)
+        self.lagged_sums += (block @ windows)[::-1]
+        self.tail = extended[len(extended) - self.max_lag:]
+
+    def autocovariance(self, max_lag=None, circular=False):
+        """
+        Calculate the auto covariances for all lags up to max_lag at once.
+        :param max_lag: largest lag (default and upper limit: the maximum lag of the counter)
+        :param circular: if True, the series is shifted circularly as in get_auto_cov
+        :return: numpy array of the auto covariances of the lags 0 to max_lag (at most N - 1)
+        """
+        max_lag = self.max_lag if max_lag is None else max_lag
+        if max_lag > self.max_lag:
+            raise ValueError('Lags larger than ' + str(self.max_lag) + ' are not available.')
+        if self.n <= 0:
+            raise RuntimeError("No values stored in the counter. Abort.")
+        self.flush()
+        n = self.n
+        lags = min(max_lag, n - 1) + 1
+        mean = self.shifted_sum / n
+        head = np.cumsum([0.] + self.head)[:lags]
+        tail = np.cumsum([0.] + self.tail[::-1].tolist())[:lags]
+        if circular:
+            wrapped = np.array([np.dot(self.head[:k], self.tail[self.max_lag - k:]) for k in range(lags)])
+            return (self.lagged_sums[:lags] + wrapped) / n - mean * mean
+        pairs = n - np.arange(lags)
+        total = self.shifted_sum
+        return (self.lagged_sums[:lags] - mean * (2 * total - head - tail) + pairs * mean * mean) / n
 
     def set_max_lag(self, max_lag):
         """
-        Change maximum lag. Cycle length is set to max_lag + 1.
+        Change maximum lag. This is only possible before the first value is counted.
         """
+        if self.n > 0:
+            raise RuntimeError('The maximum lag can only be changed before counting. Abort.')
         self.max_lag = max_lag
+        self.reset()
 
-    def report(self):
+
+class MultivariateCounter(Counter):
+    """
+    Counter for vectors of values, e.g., the inter-arrival, service, waiting and system time of every packet.
+
+    Instead of one list per quantity and product, the counter keeps the number of vectors, the mean vector and the
+    co-moment matrix (sums of the products of the deviations from the means). New vectors are collected in a block of
+    block_size vectors, whose means and co-moments are computed with numpy and merged into the running values with the
+    pairwise update of Chan et al. The same update merges counters of different workers (see merge). Hence, counting
+    a vector is a single list append and the memory is constant, unless keep_values is set.
+    Covariance and correlation are available for any pair of quantities.
+    """
+
+    def __init__(self, names, name="default", block_size=1024, keep_values=False):
         """
-        Print report for auto correlation counter.
+        Initialize the counter.
+        :param names: names of the quantities, in the order of the values of a vector
+        :param name: identifier for better distinction between various counters
+        :param block_size: number of vectors, that are collected before the running values are updated
+        :param keep_values: if True, all vectors are kept in the internal array, e.g., for scatter plots
         """
-        print('Name: ' + self.name)
-        for i in range(0, self.max_lag + 1):
-            print('Lag = ' + str(i) + '; covariance = ' + str(self.get_auto_cov(i)) + '; correlation = ' + str(
-                self.get_auto_cor(i)))
+        super(MultivariateCounter, self).__init__(name)
+        self.names = tuple(names)
+        self.index = dict((quantity, i) for i, quantity in enumerate(self.names))
+        self.block_size = block_size
+        self.keep_values = keep_values
+        self.reset()
+
+    def reset(self, *args):
+        """
+        Delete all values and reset the means and co-moments.
+        """
+        Counter.reset(self)
+        self.pending = []  # vectors, which are not yet merged into the running values
+        self.merged = 0  # number of vectors, which are merged into mean and comoment
+        self.mean = np.zeros(len(self.names))
+        self.comoment = np.zeros((len(self.names), len(self.names)))
+
+    def count(self, *args):
+        """
+        Count a vector of values, one value per quantity in the order of names.
+        """
+        self.pending.append(args)
+        if self.keep_values:
+            self.values.append(args)
+        self.n += 1
+        if len(self.pending) >= self.block_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Merge the pending vectors into the running means and co-moments.
+        """
+        if not self.pending:
+            return
+        block = np.array(self.pending, dtype=float)
+        self.pending = []
+        mean = block.mean(axis=0)
+        deviations = block - mean
+        self.merge_moments(len(block), mean, deviations.T @ deviations)
+
+    def merge_moments(self, n, mean, comoment):
+        """
+        Merge the number of vectors, the mean vector and the co-moment matrix of another set of vectors.
+        """
+        total = self.merged + n
+        delta = mean - self.mean
+        self.comoment += comoment + np.outer(delta, delta) * (self.merged * n / total)
+        self.mean += delta * (n / total)
+        self.merged = total
+
+    def merge(self, other):
+        """
+        Merge the vectors of another counter with the same quantities, e.g., of a replication on another worker.
+        If this counter keeps its values, the other counter has to keep its values as well.
+        :param other: MultivariateCounter with the same names
+        """
+        if other.names != self.names:
+            raise ValueError('Counters with different quantities can not be merged.')
+        if self.keep_values and not other.keep_values:
+            raise ValueError('The values of the other counter are not kept, they can not be merged.')
+        self.flush()
+        other.flush()
+        if other.merged > 0:
+            self.merge_moments(other.merged, other.mean, other.comoment)
+        self.n += other.n
+        if self.keep_values:
+            self.values.extend(other.values)
+
+    def get_values(self, quantity):
+        """
+        Return the counted values of a quantity.
+        :param quantity: name of the quantity
+        """
+        if not self.keep_values:
+            raise RuntimeError("The values are not kept, create the counter with keep_values=True. Abort.")
+        i = self.index[quantity]
+        return [vector[i] for vector in self.values]
+
+    def get_mean(self, quantity=None):
+        """
+        Return the mean of a quantity, or the mean vector if no quantity is given.
+        """
+        if self.n <= 0:
+            raise RuntimeError("No values stored in the counter. Abort.")
+        self.flush()
+        return self.mean.copy() if quantity is None else self.mean[self.index[quantity]]
+
+    def get_var(self, quantity=None):
+        """
+        Return the estimated variance of a quantity, or the vector of variances if no quantity is given.
+        """
+        if self.n <= 1:
+            raise RuntimeError("Less than two values stored in the counter. Abort.")
+        self.flush()
+        var = np.diag(self.comoment) / (self.n - 1)
+        return var if quantity is None else var[self.index[quantity]]
+
+    def get_stddev(self, quantity=None):
+        """
+        Return the standard deviation of a quantity, or the vector of standard deviations if no quantity is given.
+        """
+        return np.sqrt(self.get_var(quantity))
+
+    def get_cov(self, x, y):
+        """
+        Calculate the covariance of two quantities. As in TimeIndependentCrosscorrelationCounter, the sum of the
+        products of the deviations is divided by the number of vectors.
+        :param x: name of the first quantity
+        :param y: name of the second quantity
+        :return: cross covariance
+        """
+        if self.n <= 0:
+            raise RuntimeError("No values stored in the counter. Abort.")
+        self.flush()
+        return self.comoment[self.index[x], self.index[y]] / self.n
+
+    def get_cor(self, x, y):
+        """
+        Calculate the (Pearson) correlation of two quantities, which lies in [-1, 1]. Note, that this differs from
+        TimeIndependentCrosscorrelationCounter, which divides the covariance by N but the variances by N - 1, so that
+        its correlation is (N - 1) / N times the Pearson correlation.
+        :param x: name of the first quantity
+        :param y: name of the second quantity
+        :return: cross correlation, nan if one of the quantities is constant
+        """
+        self.flush()
+        i = self.index[x]
+        j = self.index[y]
+        denominator = np.sqrt(self.comoment[i, i] * self.comoment[j, j])
+        if denominator == 0:
+            return np.nan
+        return self.comoment[i, j] / denominator
+
+    def report(self, pairs=None):
+        """
+        Print covariance and correlation of pairs of quantities.
+        :param pairs: list of pairs of names (default: all pairs)
+        """
+        if pairs is None:
+            pairs = [(x, y) for i, x in enumerate(self.names) for y in self.names[i + 1:]]
+        for x, y in pairs:
+            print('Name: ' + x + ' vs. ' + y + '; covariance = ' + str(self.get_cov(x, y)) + '; correlation = ' +
+                  str(self.get_cor(x, y)))
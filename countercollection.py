@@ -1,6 +1,7 @@
-from counter import TimeIndependentCrosscorrelationCounter, TimeIndependentAutocorrelationCounter
+from counter import MultivariateCounter, StreamingAutocorrelationCounter
 from counter import TimeIndependentCounter, TimeDependentCounter
 from histogram import TimeIndependentHistogram, TimeDependentHistogram
+from warmup import WarmupDetector
 
 
 class CounterCollection(object):
@@ -11,6 +12,10 @@ class CounterCollection(object):
     It contains several counters and histograms, that are used in the different tasks.
     Reporting is done by calling the report function. This function can be adapted, depending on which counters should
     report their results and print strings or plot histograms.
+
+    The optional collectors batch_means, warmup and regenerative are set with set_collector. count_queue and
+    count_packet are only bound to the versions, that feed the collectors, while at least one of them is active, so
+    that a default run does not check for them on every event.
     """
 
     def __init__(self, sim):
@@ -19,11 +24,13 @@ class CounterCollection(object):
         :param sim: the simulation, the CounterCollection belongs to.
         """
         self.sim = sim
+        # the bootstrap of the counters is seeded by the simulation, so that no global random state is used
+        seed = sim.sim_param.SEED
 
         # waiting time
-        self.cnt_wt = TimeIndependentCounter(name='Waiting Time')
+        self.cnt_wt = TimeIndependentCounter(name='Waiting Time', seed=seed)
         self.hist_wt = TimeIndependentHistogram(self.sim, "w")
-        self.acnt_wt = TimeIndependentAutocorrelationCounter("waiting time with lags 1 to 20", max_lag=20)
+        self.acnt_wt = StreamingAutocorrelationCounter("waiting time with lags 1 to 20", max_lag=20)
 
         # queue length
         self.cnt_ql = TimeDependentCounter(self.sim, name='Queue Length')
@@ -33,14 +40,50 @@ class CounterCollection(object):
         self.cnt_sys_util = TimeDependentCounter(self.sim, name=f'sys_util={sim.sim_param.RHO}')
 
         # blocking probability
-        self.cnt_bp = TimeIndependentCounter("bp")
+        self.cnt_bp = TimeIndependentCounter("bp", seed=seed)
         self.hist_bp = TimeIndependentHistogram(self.sim, "bp")
 
-        # cross correlations
-        self.cnt_iat_wt = TimeIndependentCrosscorrelationCounter("inter-arrival time vs. waiting time")
-        self.cnt_iat_st = TimeIndependentCrosscorrelationCounter("inter-arrival time vs. service time")
-        self.cnt_iat_syst = TimeIndependentCrosscorrelationCounter("inter-arrival time vs. system time")
-        self.cnt_st_syst = TimeIndependentCrosscorrelationCounter("service time vs. system time")
+        # cross correlations of inter-arrival, service, waiting and system time, all pairs from one counter
+        self.cnt_packet_times = MultivariateCounter(('iat', 'st', 'wt', 'syst'), name='packet times')
+        self.cross_correlations = [('iat', 'wt'), ('iat', 'st'), ('iat', 'syst'), ('st', 'syst')]
+
+        # batch means collector of the batch means run mode (see Simulation.do_simulation_batch_means)
+        self.batch_means = None
+
+        # regenerative estimator of the regenerative run mode (see Simulation.do_simulation_regenerative)
+        self.regenerative = None
+
+        # warm-up detector, that resets the counters at the end of the warm-up period (see WarmupDetector)
+        self.warmup = WarmupDetector(sim) if getattr(sim, 'warmup_detection', False) else None
+        self.bind_collectors()
+
+    def set_collector(self, name, collector):
+        """
+        Set or remove an optional collector and rebind the counting methods.
+        :param name: one of batch_means, warmup and regenerative
+        :param collector: the collector, or None to remove it
+        """
+        if name not in ('batch_means', 'warmup', 'regenerative'):
+            raise ValueError('Unknown collector ' + str(name) + '.')
+        setattr(self, name, collector)
+        self.bind_collectors()
+
+    def bind_collectors(self):
+        """
+        Bind count_queue and count_packet to the versions with collectors, if at least one collector is active.
+        A run, that has bound count_queue already, keeps calling the version with collectors, which then calls the
+        remaining ones.
+        """
+        collectors = [c for c in (self.batch_means, self.warmup, self.regenerative) if c is not None]
+        self.queue_collectors = [c.count_queue for c in collectors]
+        self.packet_collectors = [c.count_packet for c in collectors]
+        if collectors:
+            self.count_queue = self.count_queue_with_collectors
+            self.count_packet = self.count_packet_with_collectors
+        else:
+            # fall back to the methods of the class
+            self.__dict__.pop('count_queue', None)
+            self.__dict__.pop('count_packet', None)
 
     def reset(self):
         """
@@ -58,10 +101,7 @@ class CounterCollection(object):
         self.cnt_bp.reset()
         self.hist_bp.reset()
 
-        self.cnt_iat_wt.reset()
-        self.cnt_iat_st.reset()
-        self.cnt_iat_syst.reset()
-        self.cnt_st_syst.reset()
+        self.cnt_packet_times.reset()
 
     def report(self):
         """
@@ -77,23 +117,32 @@ class CounterCollection(object):
 
         self.cnt_sys_util.report()
 
-        self.cnt_iat_wt.report()
-        self.cnt_iat_st.report()
-        self.cnt_iat_syst.report()
-        self.cnt_st_syst.report()
+        self.cnt_packet_times.report(self.cross_correlations)
 
     def count_packet(self, packet):
         """
         Count a packet. Its data is counted by the various counters
+        :return: waiting time of the packet
         """
-        self.cnt_wt.count(packet.get_waiting_time())
-        self.hist_wt.count(packet.get_waiting_time())
-        self.acnt_wt.count(packet.get_waiting_time())
+        wt = packet.get_waiting_time()
+        st = packet.get_service_time()
+        syst = packet.get_system_time()
+        iat = packet.get_interarrival_time()
+
+        self.cnt_wt.count(wt)
+        self.hist_wt.count(wt)
+        self.acnt_wt.count(wt)
+
+        self.cnt_packet_times.count(iat, st, wt, syst)
+        return wt
 
-        self.cnt_iat_wt.count(packet.get_interarrival_time(), packet.get_waiting_time())
-        self.cnt_iat_st.count(packet.get_interarrival_time(), packet.get_service_time())
-        self.cnt_iat_syst.count(packet.get_interarrival_time(), packet.get_system_time())
-        self.cnt_st_syst.count(packet.get_service_time(), packet.get_system_time())
+    def count_packet_with_collectors(self, packet):
+        """
+        Count a packet by the counters and by the active collectors.
+        """
+        wt = CounterCollection.count_packet(self, packet)
+        for count_packet in self.packet_collectors:
+            count_packet(wt)
 
     def count_queue(self):
         """
@@ -101,11 +150,20 @@ class CounterCollection(object):
         This function should be called at least whenever the number of packets in the buffer changes.
 
         The system utilization is counted as well and can be counted from the counter cnt_sys_util.
+        :return: queue length
         """
-        self.cnt_ql.count(self.sim.system_state.get_queue_length())
-        self.hist_ql.count(self.sim.system_state.get_queue_length())
-
-        if self.sim.system_state.server_busy:
-            self.cnt_sys_util.count(1)
-        else:
-            self.cnt_sys_util.count(0)
+        system_state = self.sim.system_state
+        queue_length = system_state.buffer.get_queue_length()
+        self.cnt_ql.count(queue_length)
+        self.hist_ql.count(queue_length)
+        self.cnt_sys_util.count(1 if system_state.server_busy else 0)
+        return queue_length
+
+    def count_queue_with_collectors(self):
+        """
+        Count the queue length and the server status by the counters and by the active collectors.
+        """
+        queue_length = CounterCollection.count_queue(self)
+        server_busy = self.sim.system_state.server_busy
+        for count_queue in self.queue_collectors:
+            count_queue(queue_length, server_busy)
@@ -1,4 +1,6 @@
+import bisect
 import heapq
+import itertools
 import random
 
 
@@ -8,28 +10,281 @@ class EventChain(object):
 
     Events can be inserted and removed from queue and are sorted by their time.
     Always the oldest event is removed.
+
+    By default, the heap stores (timestamp, priority, sequence, event) tuples, so that ordering is done by the
+    built-in tuple comparison instead of SimEvent.__lt__. The sequence number breaks ties between events with equal
+    timestamp and priority in FIFO order. With tuple_keys=False, the SimEvent objects are stored directly.
+
+    Pending events can be cancelled in O(1) with the handle returned by insert. Cancelled events stay in the heap as
+    tombstones and are skipped by remove_oldest_event. If more than half of the stored events are tombstones, the
+    heap is compacted, so that its size stays bounded.
+
+    Only events of the model are counted in num_inserted and num_removed. Events with counted set to False, e.g., a
+    SimulationPause, are stored and removed in the same way, but they are not counted.
     """
 
-    def __init__(self):
+    # minimum number of stored events before the event chain is compacted
+    min_compaction_size = 64
+
+    def __init__(self, tuple_keys=True):
         """
         Initialize variables and event chain
+        :param tuple_keys: store tuple keys in the heap instead of comparing SimEvent objects
         """
         self.event_list = []
+        self.tuple_keys = tuple_keys
+        self.sequence = itertools.count()
+        self.num_inserted = 0
+        self.num_removed = 0
+        self.num_cancelled = 0  # number of tombstones in the event chain
+
+    def __getstate__(self):
+        """
+        Return the state for pickling (see checkpoint.py). The sequence counter is stored as its next value.
+        """
+        state = self.__dict__.copy()
+        next_sequence = next(self.sequence)
+        self.sequence = itertools.count(next_sequence)
+        state['sequence'] = next_sequence
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restore the state after unpickling.
+        """
+        self.__dict__.update(state)
+        self.sequence = itertools.count(state['sequence'])
 
     def insert(self, e):
         """
         Inserts event e to the event chain. Event chain is sorted during insertion.
         :param: e is of type SimEvent
+        :return: handle of the event, which can be used for cancelling it
+        """
+        if e.counted:
+            self.num_inserted += 1
+        if self.tuple_keys:
+            heapq.heappush(self.event_list, (e.timestamp, e.priority, next(self.sequence), e))
+        else:
+            heapq.heappush(self.event_list, e)
+        return e
 
+    def remove_oldest_event(self):
+        """
+        Remove event with smallest timestamp (and priority) from queue. Cancelled events are skipped.
+        :return: next event in event chain
+        """
+        if self.tuple_keys:
+            e = heapq.heappop(self.event_list)[3]
+            while self.num_cancelled and e.cancelled:
+                self.num_cancelled -= 1
+                e = heapq.heappop(self.event_list)[3]
+        else:
+            e = heapq.heappop(self.event_list)
+            while self.num_cancelled and e.cancelled:
+                self.num_cancelled -= 1
+                e = heapq.heappop(self.event_list)
+        if e.counted:
+            self.num_removed += 1
+        return e
+
+    def cancel(self, handle):
+        """
+        Cancel a pending event. The event is only marked as cancelled and removed lazily.
+        The handle is only valid, as long as the event has not been processed.
+        :param handle: handle of the event as returned by insert
+        """
+        if handle.cancelled:
+            return
+        handle.cancelled = True
+        self.num_cancelled += 1
+        if self.num_cancelled * 2 > self.get_num_stored() >= self.min_compaction_size:
+            self.compact()
+
+    def compact(self):
+        """
+        Remove all cancelled events from the event chain.
+        """
+        if self.tuple_keys:
+            self.event_list = [entry for entry in self.event_list if not entry[3].cancelled]
+        else:
+            self.event_list = [e for e in self.event_list if not e.cancelled]
+        heapq.heapify(self.event_list)
+        self.num_cancelled = 0
+
+    def get_num_stored(self):
+        """
+        :return: number of stored events in the event chain, including cancelled ones
+        """
+        return len(self.event_list)
+
+    def __len__(self):
+        """
+        :return: number of pending (not cancelled) events in the event chain
         """
-        heapq.heappush(self.event_list, e)
+        return self.get_num_stored() - self.num_cancelled
+
+    def get_throughput(self, duration):
+        """
+        Return the number of events removed from the chain per second of wall-clock time.
+        :param duration: wall-clock time in seconds, during which the events were processed
+        :return: processed events per second
+        """
+        if duration <= 0:
+            return 0.
+        return self.num_removed / float(duration)
+
+    def report(self, duration):
+        """
+        Print a report string with the number of handled events and the throughput of the event chain.
+        :param duration: wall-clock time in seconds, during which the events were processed
+        """
+        print('Event chain: inserted = ' + str(self.num_inserted) + ', removed = ' + str(self.num_removed) +
+              ', throughput = ' + str(self.get_throughput(duration)) + ' events/s')
+
+
+class CalendarEventChain(EventChain):
+    """
+    Event chain implemented as a calendar queue (R. Brown, 1988).
+
+    Events are hashed by their timestamp into a circular array of buckets ("days") of a given width. Each bucket is
+    a sorted list of (timestamp, priority, sequence, event) tuples. Events are removed by scanning the buckets of the
+    current "year" in order, so that insert and remove take O(1) on average, independent of the number of pending
+    events. The number of buckets is doubled or halved when the number of events grows or shrinks, and the bucket
+    width is recomputed from the gaps between the earliest pending events at every resize.
+    """
+
+    # number of earliest events used to estimate the bucket width
+    width_sample_size = 25
+
+    def __init__(self, num_buckets=2, width=1.):
+        """
+        Initialize the calendar with the given number of buckets and bucket width.
+        :param num_buckets: initial number of buckets
+        :param width: initial bucket width (in ms), adapted automatically afterwards
+        """
+        super(CalendarEventChain, self).__init__()
+        self.buckets = [[] for _ in range(num_buckets)]
+        self.num_buckets = num_buckets
+        self.width = float(width)
+        self.size = 0
+        self.last_bucket = 0
+        # virtual bucket number (timestamp // width) of the last removed event
+        self.current_day = 0
+        self.last_timestamp = 0
+
+    def insert(self, e):
+        """
+        Insert event e into the bucket corresponding to its timestamp.
+        :param: e is of type SimEvent
+        :return: handle of the event, which can be used for cancelling it
+        """
+        if e.counted:
+            self.num_inserted += 1
+        entry = (e.timestamp, e.priority, next(self.sequence), e)
+        bisect.insort(self.buckets[int(e.timestamp // self.width) % self.num_buckets], entry)
+        self.size += 1
+        if self.size > 2 * self.num_buckets:
+            self._resize(2 * self.num_buckets)
+        return e
 
     def remove_oldest_event(self):
         """
-        Remove event with smallest timestamp (and priority) from queue
+        Remove event with smallest timestamp (and priority) from the calendar. Cancelled events are skipped.
         :return: next event in event chain
         """
-        return heapq.heappop(self.event_list)
+        e = self._remove_first()
+        while self.num_cancelled and e.cancelled:
+            self.num_cancelled -= 1
+            e = self._remove_first()
+        if e.counted:
+            self.num_removed += 1
+        return e
+
+    def compact(self):
+        """
+        Remove all cancelled events from the calendar.
+        """
+        for i, b in enumerate(self.buckets):
+            self.buckets[i] = [entry for entry in b if not entry[3].cancelled]
+        self.size = sum(len(b) for b in self.buckets)
+        self.num_cancelled = 0
+
+    def get_num_stored(self):
+        """
+        :return: number of stored events in the calendar, including cancelled ones
+        """
+        return self.size
+
+    def _remove_first(self):
+        """
+        Remove the first stored event from the calendar, regardless of whether it is cancelled.
+        """
+        if self.size == 0:
+            raise IndexError("remove from empty event chain")
+
+        buckets = self.buckets
+        width = self.width
+        i = self.last_bucket
+        day = self.current_day
+        for _ in range(self.num_buckets):
+            b = buckets[i]
+            if b and b[0][0] // width <= day:
+                return self._pop(i, day)
+            i += 1
+            if i == self.num_buckets:
+                i = 0
+            day += 1
+
+        # no event within one year: direct search for the earliest event and re-estimate the bucket width
+        i = min((b[0], j) for j, b in enumerate(buckets) if b)[1]
+        e = self._pop(i, int(buckets[i][0][0] // width))
+        if self.size > 1:
+            self._resize(self.num_buckets)
+        return e
+
+    def _pop(self, i, day):
+        """
+        Remove the first event of bucket i and move the calendar to this bucket.
+        """
+        entry = self.buckets[i].pop(0)
+        self.size -= 1
+        self.last_bucket = i
+        self.current_day = day
+        self.last_timestamp = entry[0]
+        if self.num_buckets > 2 and self.size < self.num_buckets // 2:
+            self._resize(self.num_buckets // 2)
+        return entry[3]
+
+    def _estimate_width(self, entries):
+        """
+        Estimate a new bucket width from the average gap between the earliest pending events.
+        Gaps larger than twice the average are ignored, since they are not representative.
+        :return: three times the average gap, or the current width if no positive gaps are available
+        """
+        sample = [entry[0] for entry in heapq.nsmallest(self.width_sample_size, entries)]
+        gaps = [b - a for a, b in zip(sample, sample[1:])]
+        if not gaps:
+            return self.width
+        avg = sum(gaps) / len(gaps)
+        gaps = [g for g in gaps if g <= 2 * avg]
+        avg = sum(gaps) / len(gaps)
+        if avg <= 0:
+            return self.width
+        return 3. * avg
+
+    def _resize(self, num_buckets):
+        """
+        Rebuild the calendar with the given number of buckets and a newly estimated bucket width.
+        """
+        entries = [entry for b in self.buckets for entry in b]
+        self.width = self._estimate_width(entries)
+        self.num_buckets = num_buckets
+        self.buckets = [[] for _ in range(num_buckets)]
+        for entry in sorted(entries):
+            self.buckets[int(entry[0] // self.width) % num_buckets].append(entry)
+        self.current_day = int(self.last_timestamp // self.width)
+        self.last_bucket = self.current_day % num_buckets
 
 
 class SimEvent(object):
@@ -38,8 +293,14 @@ class SimEvent(object):
 
     Contains mainly abstract methods that should be implemented in the subclasses.
     Comparison for EventChain insertion is implemented by comparing first the timestamps and then the priorities
+    Events use a slotted layout, subclasses should define __slots__ as well.
     """
 
+    __slots__ = ('timestamp', 'priority', 'sim', 'cancelled')
+
+    # events of the model are counted by the event chain (see EventChain)
+    counted = True
+
     def __init__(self, sim, timestamp):
         """
         Initialization routine, setting the timestamp of the event and the simulation it belongs to.
@@ -47,6 +308,7 @@ class SimEvent(object):
         self.timestamp = timestamp
         self.priority = 0
         self.sim = sim
+        self.cancelled = False
 
     def process(self):
         """
@@ -60,10 +322,7 @@ class SimEvent(object):
         """
         if self.timestamp != other.timestamp:
             return self.timestamp < other.timestamp
-        elif self.priority != other.priority:
-            return self.priority < other.priority
-        else:
-            return self.priority < other.priority
+        return self.priority < other.priority
 
 
 class CustomerArrival(SimEvent):
@@ -71,6 +330,8 @@ class CustomerArrival(SimEvent):
     Defines a new customer arrival event (new packet comes into the system)
     """
 
+    __slots__ = ()
+
     def __init__(self, sim, timestamp):
         """
         Create a new customer arrival event with given execution time.
@@ -89,23 +350,28 @@ class CustomerArrival(SimEvent):
         If packet is added to the server, a service completion event is generated.
         Each customer is counted either as accepted or as dropped.
         """
-        ev = CustomerArrival(self.sim, self.sim.sim_state.now + self.sim.rng.get_iat() * 1000)
-
-        self.sim.event_chain.insert(ev)
-
-        if self.sim.system_state.add_packet_to_server():
+        sim = self.sim
+        sim_state = sim.sim_state
+        system_state = sim.system_state
+        insert = sim.event_chain.insert
+        pool = sim.pool
+        now = sim_state.now
+        # the next arrival has the same type, e.g., RenegingCustomerArrival in systems with impatient customers
+        t = now + sim.rng.get_iat() * 1000
+        insert(pool.acquire(type(self), sim, t) if pool.enabled else type(self)(sim, t))
+
+        if system_state.add_packet_to_server():
             # packet is added to server and served
-            ev = ServiceCompletion(
-                self.sim, self.sim.sim_state.now + self.sim.rng.get_st() * 1000)
-            self.sim.event_chain.insert(ev)
-            self.sim.sim_state.packet_accepted()
+            t = now + sim.rng.get_st() * 1000
+            insert(pool.acquire(ServiceCompletion, sim, t) if pool.enabled else ServiceCompletion(sim, t))
+            sim_state.packet_accepted()
 
         else:
-            if self.sim.system_state.add_packet_to_queue():
+            if system_state.add_packet_to_queue():
                 # packet is added to queue
-                self.sim.sim_state.packet_accepted()
+                sim_state.packet_accepted()
             else:
-                self.sim.sim_state.packet_dropped()
+                sim_state.packet_dropped()
 
 
 class ServiceCompletion(SimEvent):
@@ -113,6 +379,8 @@ class ServiceCompletion(SimEvent):
     Defines a service completion event (highest priority in EventChain)
     """
 
+    __slots__ = ()
+
     def __init__(self, sim, timestamp):
         """
         Create a new service completion event with given execution time.
@@ -126,16 +394,64 @@ class ServiceCompletion(SimEvent):
         """
         Processing procedure of a service completion.
 
-        First, the server is set from busy to idle.
+        First, the server is set from busy to idle and the completed packet is handed back to the pool.
         Then, if the queue is not empty, the next packet is taken from the queue and served,
         hence a new service completion event is created and inserted in the event chain.
+        Otherwise, the system is empty, which is a regeneration point for the regenerative run mode.
         """
-        self.sim.system_state.complete_service()
-        if self.sim.system_state.start_service():
+        sim = self.sim
+        system_state = sim.system_state
+        pool = sim.pool
+        packet = system_state.complete_service()
+        if pool.enabled:
+            pool.release(packet)
+        if system_state.start_service():
             # trigger next packet
-            ev = ServiceCompletion(
-                self.sim, self.sim.sim_state.now + self.sim.rng.get_st() * 1000)
-            self.sim.event_chain.insert(ev)
+            t = sim.sim_state.now + sim.rng.get_st() * 1000
+            ev = pool.acquire(ServiceCompletion, sim, t) if pool.enabled else ServiceCompletion(sim, t)
+            sim.event_chain.insert(ev)
+        elif sim.counter_collection.regenerative is not None:
+            sim.counter_collection.regenerative.regenerate()
+
+
+class RenegingCustomerArrival(CustomerArrival):
+    """
+    Customer arrival for systems with impatient customers (see RenegingSystemState).
+
+    The processing is the same as for a CustomerArrival, the next arrival is a RenegingCustomerArrival as well. If the
+    packet is enqueued, the system state schedules its Reneging event.
+    """
+
+    __slots__ = ()
+
+
+class Reneging(SimEvent):
+    """
+    Defines the abandonment of a waiting customer, whose patience time has run out.
+
+    The event is cancelled by the system state, if the service of the packet starts in time.
+    """
+
+    __slots__ = ('packet',)
+
+    def __init__(self, sim, timestamp, packet):
+        """
+        Create a new reneging event for the given packet with given execution time.
+
+        Priority of reneging event is set to 1 (same as customer arrival)
+        """
+        super(Reneging, self).__init__(sim, timestamp)
+        self.priority = 1
+        self.packet = packet
+
+    def process(self):
+        """
+        The packet is removed from the queue and counted as reneged.
+        """
+        sim = self.sim
+        sim.system_state.renege(self.packet)
+        sim.sim_state.packet_reneged()
+        self.packet = None
 
 
 class SimulationTermination(SimEvent):
@@ -143,6 +459,8 @@ class SimulationTermination(SimEvent):
     Defines the end of a simulation. (least priority in EventChain)
     """
 
+    __slots__ = ()
+
     def __init__(self, sim, timestamp):
         """
         Create a new simulation termination event with given execution time.
@@ -154,6 +472,36 @@ class SimulationTermination(SimEvent):
 
     def process(self):
         """
-        Simulation stop flag is set to true, so simulation is stopped after this event.
+        Simulation stop and finished flags are set to true, so simulation is stopped after this event.
+        """
+        self.sim.sim_state.stop = True
+        self.sim.sim_state.finished = True
+
+
+class SimulationPause(SimEvent):
+    """
+    Defines an interruption of a simulation, e.g., for taking a snapshot (see Simulation.run_until).
+    Its priority is lower than the priority of all other events, so that all events at the same time are processed
+    before. The run can be continued afterwards.
+    The pause is not an event of the model, hence it is not counted by the event chain and the kernel stops before
+    the counters are updated (see Simulation.run).
+    """
+
+    __slots__ = ()
+
+    counted = False
+
+    def __init__(self, sim, timestamp):
+        """
+        Create a new simulation pause event with given execution time.
+
+        Priority of simulation pause event is set to 3 (after the termination)
+        """
+        super(SimulationPause, self).__init__(sim, timestamp)
+        self.priority = 3
+
+    def process(self):
+        """
+        Simulation stop flag is set to true, so simulation is interrupted after this event.
         """
         self.sim.sim_state.stop = True
@@ -1,4 +1,4 @@
-import queue
+from collections import deque
 
 
 class FiniteQueue(object):
@@ -16,7 +16,7 @@ class FiniteQueue(object):
         :return: FiniteQueue object
         """
         self.sim = sim
-        self.buffer = queue.Queue()
+        self.buffer = deque()
 
     def add(self, packet):
         """
@@ -24,8 +24,8 @@ class FiniteQueue(object):
         :param packet: packet which is supposed to be queued
         :return: true if packet has been enqueued, false if rejected
         """
-        if self.buffer.qsize() < self.sim.sim_param.S:
-            self.buffer.put(packet)
+        if len(self.buffer) < self.sim.sim_param.S:
+            self.buffer.append(packet)
             return True
         else:
             return False
@@ -35,25 +35,37 @@ class FiniteQueue(object):
         Return the first packet in line and remove it from the FIFO
         :return: first packet in line
         """
-        if not self.buffer.empty():
-            return self.buffer.get()
+        if self.buffer:
+            return self.buffer.popleft()
         else:
             return None
 
+    def remove_packet(self, packet):
+        """
+        Remove the given packet from any position of the FIFO
+        :param packet: packet which leaves the queue
+        :return: true if packet has been removed, false if it is not in the queue
+        """
+        try:
+            self.buffer.remove(packet)
+            return True
+        except ValueError:
+            return False
+
     def get_queue_length(self):
         """
         :return: fill status of the queue
         """
-        return self.buffer.qsize()
+        return len(self.buffer)
 
     def is_empty(self):
         """
         :return: true if queue is empty
         """
-        return self.buffer.empty()
+        return not self.buffer
 
     def flush(self):
         """
         erase all packets from the FIFO
         """
-        self.buffer = queue.Queue()
+        self.buffer = deque()
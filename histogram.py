@@ -183,10 +183,10 @@ class TimeDependentHistogram(Histogram):
         Add new value to histogram, i.e., the internal array.
         Consider the duration of this value as well.
         """
-        dt = self.sim.sim_state.now - self.last_timestamp
+        now = self.sim.sim_state.now
         self.values.append(value)
-        self.weights.append(dt)
-        self.last_timestamp = self.sim.sim_state.now
+        self.weights.append(now - self.last_timestamp)
+        self.last_timestamp = now
 
     def reset(self):
         self.first_timestamp = self.sim.sim_state.now
@@ -0,0 +1,119 @@
+from collections import deque
+
+import numpy
+
+
+class LindleyEngine(object):
+    """
+    Fast simulation engine for the FIFO single server system with finite buffer (e.g. M/M/1/S).
+
+    Instead of processing events, the engine iterates over the customers in order of their arrival. The service start
+    of every accepted customer is either its arrival time (idle server) or the departure time of its predecessor
+    (Lindley recursion). The start times of the waiting customers are kept for determining the buffer occupancy.
+
+    Inter-arrival and service times are drawn in blocks from the RNG of the simulation. The streams are consumed in
+    the same order and by the same amount as in Simulation.do_simulation(), so that both engines produce the same
+    sample path for the same seeds, also for consecutive runs without reseeding. Counts and the mean waiting time are
+    identical, the time averages (utilization, queue length) are equal up to floating point rounding.
+    """
+
+    def __init__(self, sim):
+        """
+        Initialize the engine.
+        :param sim: simulation providing the parameters (SIM_TIME, S), the RNG and the SimResult object
+        """
+        self.sim = sim
+
+    def do_simulation(self):
+        """
+        Do one simulation run until SIM_TIME.
+        :return: SimResult object of the simulation
+        """
+        sim = self.sim
+        sim_time = sim.sim_param.SIM_TIME
+        buffer_size = sim.sim_param.S
+        iat_rns = sim.rng.iat_rns
+        st_rns = sim.rng.st_rns
+
+        iat_state = iat_rns.get_state()
+        st_state = st_rns.get_state()
+
+        arrivals = self.get_arrival_times(sim_time)
+        service_times = (st_rns.next_array(len(arrivals)) * 1000).tolist()
+
+        queue = deque()  # service start times of the waiting packets
+        waiting_times = []
+        last_departure = 0
+        busy_time = 0.
+        queue_time = 0.
+        num_blocked = 0
+        num_started = 0
+        k = 0
+
+        for t_arrival in arrivals.tolist():
+            # packets, whose service has started, leave the queue
+            while queue and queue[0] <= t_arrival:
+                queue.popleft()
+
+            if last_departure <= t_arrival:
+                # server is idle
+                t_start = t_arrival
+            elif len(queue) < buffer_size:
+                t_start = last_departure
+                queue.append(t_start)
+            else:
+                num_blocked += 1
+                continue
+
+            t_complete = t_start + service_times[k]
+            k += 1
+            if t_start <= sim_time:
+                num_started += 1
+                queue_time += t_start - t_arrival
+                busy_time += min(t_complete, sim_time) - t_start
+                if t_complete <= sim_time:
+                    waiting_times.append(t_start - t_arrival)
+            else:
+                queue_time += sim_time - t_arrival
+            last_departure = t_complete
+
+        # consume exactly as many random numbers as the event based simulation
+        iat_rns.set_state(iat_state)
+        iat_rns.skip(len(arrivals))
+        st_rns.set_state(st_state)
+        st_rns.skip(num_started)
+
+        sim.sim_state.now = sim_time
+        sim.sim_state.stop = True
+        sim.sim_state.num_packets = len(arrivals)
+        sim.sim_state.num_blocked_packets = num_blocked
+
+        result = sim.sim_result
+        result.engine = 'LindleyEngine'
+        result.system_utilization = busy_time / sim_time
+        result.mean_queue_length = queue_time / sim_time
+        result.mean_waiting_time = sum(waiting_times) / len(waiting_times) if waiting_times else 0
+        result.packets_dropped = num_blocked
+        result.packets_served = len(arrivals) - num_blocked
+        result.packets_total = len(arrivals)
+        result.blocking_probability = sim.sim_state.get_blocking_probability()
+        return result
+
+    def get_arrival_times(self, sim_time):
+        """
+        Draw inter-arrival times in blocks and return all arrival times up to sim_time. The first customer arrives at 0.
+        :param sim_time: simulation time in ms
+        :return: numpy array of arrival times
+        """
+        iat_rns = self.sim.rng.iat_rns
+        # expected number of arrivals with some margin
+        block_size = int(sim_time / (iat_rns.mean * 1000) * 1.1) + 100 if hasattr(iat_rns, 'mean') else 1000
+
+        arrivals = [numpy.zeros(1)]
+        last = 0
+        while last <= sim_time:
+            block = numpy.cumsum(numpy.concatenate(([last], iat_rns.next_array(block_size) * 1000)))[1:]
+            arrivals.append(block)
+            last = block[-1]
+        arrivals = numpy.concatenate(arrivals)
+        return arrivals[:numpy.searchsorted(arrivals, sim_time, side='right')]
@@ -0,0 +1,126 @@
+import numpy
+
+from simresult import RESULT_DTYPE, SimResult
+
+
+class LockstepEngine(object):
+    """
+    Vectorized engine, that simulates R independent replications of the M/M/1/S system in lockstep.
+
+    The state of every replication (queue length, server status, next arrival, next departure and the accumulators for
+    the results) is stored in NumPy arrays of length R, one lane per replication. In every step, each lane processes
+    its next event, so that the cost of a step hardly depends on R. The arrival times of the waiting packets are
+    stored in a ring buffer per lane, hence the memory grows with R * S.
+
+    Inter-arrival and service times are drawn from a NumPy Generator. The results are reproducible for a given seed
+    and number of replications, but they differ from the sample paths of the event based simulation.
+    """
+
+    def __init__(self, sim_param, replications, seed=None):
+        """
+        Initialize the engine.
+        :param sim_param: simulation parameters (SIM_TIME, S, RHO)
+        :param replications: number of independent replications R
+        :param seed: optional seed for the NumPy Generator
+        """
+        self.sim_param = sim_param
+        self.replications = replications
+        self.rng = numpy.random.default_rng(seed)
+
+    def do_simulation(self):
+        """
+        Simulate all replications until SIM_TIME.
+        :return: result table (structured array with dtype RESULT_DTYPE) with one row per replication
+        """
+        r = self.replications
+        sim_time = self.sim_param.SIM_TIME
+        buffer_size = self.sim_param.S
+        mean_iat = 1000.
+        mean_st = 1000. * self.sim_param.RHO
+        exponential = self.rng.exponential
+        lanes = numpy.arange(r)
+
+        # system state
+        now = numpy.zeros(r)
+        next_arrival = numpy.zeros(r)
+        next_departure = numpy.full(r, numpy.inf)
+        queue_length = numpy.zeros(r, dtype=int)
+        server_busy = numpy.zeros(r, dtype=bool)
+        wt_in_service = numpy.zeros(r)
+        capacity = max(buffer_size, 1)
+        ring = numpy.zeros((r, capacity))
+        head = numpy.zeros(r, dtype=int)
+
+        # accumulators
+        queue_area = numpy.zeros(r)
+        busy_time = numpy.zeros(r)
+        sum_wt = numpy.zeros(r)
+        num_served = numpy.zeros(r, dtype=int)
+        num_packets = numpy.zeros(r, dtype=int)
+        num_blocked = numpy.zeros(r, dtype=int)
+
+        while True:
+            # service completions have priority over arrivals at the same time
+            departure = next_departure <= next_arrival
+            t = numpy.where(departure, next_departure, next_arrival)
+            active = t <= sim_time
+            if not active.any():
+                break
+
+            dt = numpy.where(active, t - now, 0.)
+            queue_area += queue_length * dt
+            busy_time += server_busy * dt
+            now = numpy.where(active, t, now)
+
+            iat = exponential(mean_iat, r)
+            st = exponential(mean_st, r)
+
+            # service completions
+            dep = active & departure
+            sum_wt += numpy.where(dep, wt_in_service, 0.)
+            num_served += dep
+            start = dep & (queue_length > 0)
+            wt_in_service = numpy.where(start, now - ring[lanes, head], wt_in_service)
+            head = numpy.where(start, (head + 1) % capacity, head)
+            queue_length -= start
+            next_departure = numpy.where(start, now + st, numpy.where(dep, numpy.inf, next_departure))
+            server_busy &= ~(dep & ~start)
+
+            # customer arrivals
+            arr = active & ~departure
+            num_packets += arr
+            next_arrival = numpy.where(arr, now + iat, next_arrival)
+            serve = arr & ~server_busy
+            server_busy |= serve
+            wt_in_service = numpy.where(serve, 0., wt_in_service)
+            next_departure = numpy.where(serve, now + st, next_departure)
+            enqueue = arr & server_busy & ~serve & (queue_length < buffer_size)
+            tail = (head + queue_length) % capacity
+            ring[lanes[enqueue], tail[enqueue]] = now[enqueue]
+            queue_length += enqueue
+            num_blocked += arr & server_busy & ~serve & ~enqueue
+
+        # count the time from the last event until the end of the simulation
+        queue_area += queue_length * (sim_time - now)
+        busy_time += server_busy * (sim_time - now)
+
+        table = numpy.zeros(r, dtype=RESULT_DTYPE)
+        table['system_utilization'] = busy_time / sim_time
+        table['mean_queue_length'] = queue_area / sim_time
+        table['mean_waiting_time'] = numpy.where(num_served > 0, sum_wt / numpy.maximum(num_served, 1), 0.)
+        table['blocking_probability'] = num_blocked / numpy.maximum(num_packets, 1)
+        table['packets_dropped'] = num_blocked
+        table['packets_served'] = num_packets - num_blocked
+        table['packets_total'] = num_packets
+        return table
+
+    def get_sim_results(self, table):
+        """
+        Convert a result table into a list of SimResult objects.
+        :param table: result table as returned by do_simulation
+        :return: list of SimResult objects, one per replication
+        """
+        results = [SimResult.from_record(row) for row in table]
+        for result in results:
+            result.engine = 'LockstepEngine'
+        return results
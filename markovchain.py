@@ -0,0 +1,118 @@
+import numpy
+
+from rng import ExponentialRNS
+
+
+class MarkovChainEngine(object):
+    """
+    Simulation engine for Markovian systems, i.e., M/M/1/S with exponential inter-arrival and service times.
+
+    The number of packets in the system is a continuous time Markov chain, which is simulated by uniformization:
+    the number of steps in [0, SIM_TIME] is Poisson distributed with rate lambda + mu, and every step is an arrival
+    with probability lambda / (lambda + mu) or a (possibly fictitious) departure otherwise. Given the number of steps,
+    all intervals between steps have the same expected length, so time averages are estimated by averaging over the
+    visited states. The steps are drawn in bulk and no event chain, packets or per-packet counters are needed.
+
+    The mean waiting time is estimated with Little's law from the mean queue length and the rate of accepted packets.
+    The steps are drawn from a NumPy Generator, which is seeded with the 'jumps' substream of the simulation (see
+    Simulation.get_seed), so the IAT and ST streams are not used. Consecutive runs of the engine continue the
+    Generator, hence they are different but reproducible.
+    """
+
+    def __init__(self, sim):
+        """
+        Initialize the engine.
+        :param sim: simulation providing the parameters (SIM_TIME, S), the exponential RNS and the SimResult object
+        """
+        if not is_markovian(sim):
+            raise TypeError("MarkovChainEngine requires exponential inter-arrival and service times.")
+        self.sim = sim
+        self.generator = numpy.random.default_rng(sim.get_seed('jumps'))
+
+    def do_simulation(self):
+        """
+        Do one simulation run until SIM_TIME.
+        :return: SimResult object of the simulation
+        """
+        sim = self.sim
+        sim_time = sim.sim_param.SIM_TIME
+        capacity = sim.sim_param.S + 1
+        lambda_x = 1. / (sim.rng.iat_rns.mean * 1000)
+        mu = 1. / (sim.rng.st_rns.mean * 1000)
+
+        rng = self.generator
+        num_steps = rng.poisson((lambda_x + mu) * sim_time)
+        arrivals = rng.random(num_steps) < lambda_x / (lambda_x + mu)
+
+        n = 0
+        num_packets = 0
+        num_blocked = 0
+        sum_n = 0
+        busy_steps = 0
+        for is_arrival in arrivals.tolist():
+            if is_arrival:
+                num_packets += 1
+                if n < capacity:
+                    n += 1
+                else:
+                    num_blocked += 1
+            elif n > 0:
+                n -= 1
+            sum_n += n
+            if n > 0:
+                busy_steps += 1
+
+        # the initial (empty) state is visited as well
+        num_states = num_steps + 1
+        mean_queue_length = (sum_n - busy_steps) / num_states
+        num_accepted = num_packets - num_blocked
+
+        sim.sim_state.now = sim_time
+        sim.sim_state.stop = True
+        sim.sim_state.num_packets = num_packets
+        sim.sim_state.num_blocked_packets = num_blocked
+
+        result = sim.sim_result
+        result.engine = 'MarkovChainEngine'
+        result.system_utilization = busy_steps / num_states
+        result.mean_queue_length = mean_queue_length
+        result.mean_waiting_time = mean_queue_length * sim_time / num_accepted if num_accepted > 0 else 0
+        result.packets_dropped = num_blocked
+        result.packets_served = num_accepted
+        result.packets_total = num_packets
+        result.blocking_probability = num_blocked / num_packets if num_packets > 0 else 0
+        return result
+
+
+def stationary_distribution(rho, S):
+    """
+    Return the stationary distribution of the number of packets in the M/M/1/S system with S buffer spaces.
+    :param rho: utilization lambda / mu
+    :param S: number of buffer spaces
+    :return: numpy array p with the probabilities p[n] of n = 0, ..., S + 1 packets in the system
+    """
+    if rho == 1:
+        return numpy.full(S + 2, 1. / (S + 2))
+    p = (1 - rho) * numpy.power(float(rho), numpy.arange(S + 2))
+    return p / (1 - rho ** (S + 2))
+
+
+def is_markovian(sim):
+    """
+    :return: true if both the inter-arrival and the service times of the simulation are exponentially distributed
+    """
+    return isinstance(sim.rng.iat_rns, ExponentialRNS) and isinstance(sim.rng.st_rns, ExponentialRNS)
+
+
+def select_engine(sim):
+    """
+    Select the engine for a simulation. For exponential inputs, the MarkovChainEngine is used, otherwise the event
+    based simulation itself. Both provide do_simulation(), which returns a SimResult object.
+    The selection is opt-in, e.g., run_replication(sim_param, index, engine=select_engine), since the runners use the
+    event based simulation by default.
+    :param sim: simulation object
+    :return: engine for the simulation
+    """
+    if is_markovian(sim):
+        return MarkovChainEngine(sim)
+    return sim
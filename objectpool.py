@@ -0,0 +1,66 @@
+class ObjectPool(object):
+    """
+    ObjectPool recycles short-lived simulation objects (SimEvents and Packets).
+
+    Objects are requested with acquire(), which either reinitializes a released object of the same class or creates
+    a new one. Processed events and completed packets are handed back with release(). The number of allocated and
+    reused objects is counted, so that the savings of the pool can be verified.
+    If the pool is disabled, released objects are simply dropped and acquire() creates new objects without counting
+    them. The per-event paths of the simulation do not call acquire() in this case, but create their objects directly.
+    """
+
+    def __init__(self, enabled=False):
+        """
+        Initialize the pool with empty free lists.
+        :param enabled: if True, released objects are kept for reuse
+        """
+        self.enabled = enabled
+        self.free_lists = {}
+        self.num_allocated = 0
+        self.num_reused = 0
+        self.num_released = 0
+
+    def acquire(self, cls, *args):
+        """
+        Return an object of class cls initialized with the given arguments.
+        A released object is reused, if available.
+        :param cls: class of the requested object, e.g., CustomerArrival or Packet
+        :param args: arguments for the initialization of the object
+        :return: object of class cls
+        """
+        if not self.enabled:
+            return cls(*args)
+        free_list = self.free_lists.get(cls)
+        if free_list:
+            obj = free_list.pop()
+            obj.__init__(*args)
+            self.num_reused += 1
+        else:
+            obj = cls(*args)
+            self.num_allocated += 1
+        return obj
+
+    def release(self, obj):
+        """
+        Hand an object back to the pool. The object must not be used by the caller afterwards.
+        :param obj: event or packet, that is not referenced anymore
+        """
+        if self.enabled:
+            free_list = self.free_lists.get(type(obj))
+            if free_list is None:
+                free_list = self.free_lists[type(obj)] = []
+            free_list.append(obj)
+            self.num_released += 1
+
+    def get_num_free(self):
+        """
+        :return: number of objects, that are currently stored for reuse
+        """
+        return sum(len(free_list) for free_list in self.free_lists.values())
+
+    def report(self):
+        """
+        Print a report string with the allocation counters of the pool.
+        """
+        print('Object pool: allocated = ' + str(self.num_allocated) + ', reused = ' + str(self.num_reused) +
+              ', released = ' + str(self.num_released) + ', free = ' + str(self.get_num_free()))
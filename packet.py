@@ -7,6 +7,8 @@ class Packet(object):
     and the status of the packet (served, completed).
     """
 
+    __slots__ = ('sim', 't_arrival', 't_start', 't_complete', 'iat', 'waiting', 'served', 'completed')
+
     def __init__(self, sim, iat=None):
         """
         Initialize a packet with its arrival time and (optionally) the inter-arrival time w.r.t. the last packet.
@@ -3,7 +3,6 @@
 
 from simparam import SimParam
 from simulation import Simulation
-import random
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -21,7 +20,6 @@ def task_1_7_1():
     :return: Minimum number of buffer spaces to meet requirements.
     """
     sim_param = SimParam()
-    random.seed(sim_param.SEED)
     sim = Simulation(sim_param)
     return do_simulation_study(sim)[0]
 
@@ -32,7 +30,6 @@ def task_1_7_2():
     :return: Minimum number of buffer spaces to meet requirements.
     """
     sim_param = SimParam()
-    random.seed(sim_param.SEED)
     sim_param.SIM_TIME = 1000000
     sim_param.MAX_DROPPED = 100
     sim_param.NO_OF_RUNS = 100
@@ -47,7 +44,6 @@ def task_1_7_3():
     fig, axs = plt.subplots(1, 3)
     fig.set_figwidth(21)
     sim_param = SimParam()
-    random.seed(sim_param.SEED)
     sim1 = Simulation(sim_param)
     size_1, block_p_1 = do_simulation_study(sim1)
     axs[0].plot(block_p_1[size_1], label=f"100s, <10 drops in 80%, s={size_1}")
@@ -55,7 +51,6 @@ def task_1_7_3():
     sim_param.SIM_TIME = 1000000
     sim_param.MAX_DROPPED = 100
     sim_param.NO_OF_RUNS = 100
-    random.seed(sim_param.SEED)
     sim2 = Simulation(sim_param)
 
     size_2, block_p_2 = do_simulation_study(sim2)
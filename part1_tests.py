@@ -1,7 +1,8 @@
 import unittest
-from event import EventChain, CustomerArrival, ServiceCompletion, SimulationTermination
+from event import EventChain, CalendarEventChain, CustomerArrival, ServiceCompletion, SimulationTermination
 from systemstate import SystemState
-from simulation import Simulation
+from simulation import Simulation, RenegingSimulation
+from simparam import SimParam
 import random
 
 
@@ -82,6 +83,96 @@ class DESTest(unittest.TestCase):
         self.assertEqual(len(e.event_list), 0,
                          msg="Error in EventChain or SimEvent. EventChain should be empty.")
 
+    def test_event_chain_tie_breaking(self):
+        """
+        Test that events with equal timestamp and priority are returned in insertion order and that the legacy
+        object heap returns the same order as the tuple keyed heap.
+        """
+        e = EventChain()
+        events = [CustomerArrival(None, 10) for _ in range(5)]
+        for ev in events:
+            e.insert(ev)
+        for ev in events:
+            self.assertIs(e.remove_oldest_event(), ev,
+                          msg="Error in EventChain. Events with equal keys are not returned in FIFO order.")
+        self.assertEqual([e.num_inserted, e.num_removed], [5, 5],
+                         msg="Error in EventChain. Wrong number of inserted or removed events counted.")
+
+        for tuple_keys in [True, False]:
+            e = EventChain(tuple_keys=tuple_keys)
+            for t in [7, 3, 9, 1, 3]:
+                e.insert(ServiceCompletion(None, t))
+                e.insert(CustomerArrival(None, t))
+            order = [(ev.timestamp, ev.priority) for ev in [e.remove_oldest_event() for _ in range(10)]]
+            self.assertEqual(order, sorted(order),
+                             msg="Error in EventChain. Events are returned in the wrong order.")
+
+    def test_calendar_event_chain(self):
+        """
+        Test CalendarEventChain against the heap based EventChain with a random sequence of inserts and removals.
+        """
+        r = random.Random(0)
+        heap = EventChain()
+        calendar = CalendarEventChain()
+        now = 0
+        for _ in range(5000):
+            if r.random() < .55 or len(heap) == 0:
+                ev = r.choice([CustomerArrival, ServiceCompletion])(None, now + r.expovariate(.001))
+                heap.insert(ev)
+                calendar.insert(ev)
+            else:
+                ev = heap.remove_oldest_event()
+                self.assertIs(calendar.remove_oldest_event(), ev,
+                              msg="Error in CalendarEventChain. Events are returned in the wrong order.")
+                now = ev.timestamp
+        while len(heap) > 0:
+            self.assertIs(calendar.remove_oldest_event(), heap.remove_oldest_event(),
+                          msg="Error in CalendarEventChain. Events are returned in the wrong order.")
+        self.assertEqual(len(calendar), 0,
+                         msg="Error in CalendarEventChain. EventChain should be empty.")
+
+    def test_event_cancellation(self):
+        """
+        Test the lazy cancellation of events for both event chain backends. Cancelled events are never returned and the
+        number of stored events stays bounded, even if most events are cancelled.
+        """
+        for chain in [EventChain(), CalendarEventChain()]:
+            kept = []
+            for i in range(10000):
+                handle = chain.insert(CustomerArrival(None, i))
+                if i % 10 == 0:
+                    kept.append(handle)
+                else:
+                    chain.cancel(handle)
+                self.assertLessEqual(chain.get_num_stored(), 2 * len(kept) + chain.min_compaction_size,
+                                     msg="Error in EventChain. Cancelled events are not compacted.")
+            self.assertEqual(len(chain), len(kept),
+                             msg="Error in EventChain. Wrong number of pending events.")
+            for ev in kept:
+                self.assertIs(chain.remove_oldest_event(), ev,
+                              msg="Error in EventChain. Cancelled event returned or wrong order.")
+            self.assertEqual(len(chain), 0,
+                             msg="Error in EventChain. EventChain should be empty.")
+
+    def test_reneging(self):
+        """
+        Test the simulation with impatient customers. Every accepted packet is either served or reneged.
+        """
+        param = SimParam()
+        param.RHO = .9
+        param.S = 20
+        param.SIM_TIME = 1000000
+        sim = RenegingSimulation(param)
+        r = sim.do_simulation()
+        self.assertGreater(r.packets_reneged, 0,
+                           msg="Error in RenegingSimulation. Impatient customers should leave the queue.")
+        in_system = sim.system_state.get_queue_length() + int(sim.system_state.server_busy)
+        self.assertEqual(r.packets_total - r.packets_dropped - r.packets_reneged,
+                         sim.counter_collection.cnt_wt.n + in_system,
+                         msg="Error in RenegingSimulation. Accepted packets are neither served nor reneged.")
+        self.assertEqual(len(sim.system_state.reneging_events), sim.system_state.get_queue_length(),
+                         msg="Error in RenegingSimulation. Every queued packet should have one reneging event.")
+
     def test_customer_arrival(self):
         """
         Test CustomerArrival process function. Check, whether adding customers to server or queue or dropping them
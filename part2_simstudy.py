@@ -5,7 +5,6 @@ from simparam import SimParam
 from simulation import Simulation
 from histogram import TimeIndependentHistogram
 from counter import TimeIndependentCounter
-import random
 
 """
 This file should be used to keep all necessary code that is used for the simulation study in part 2 of the programming
@@ -21,7 +20,6 @@ def task_2_7_1():
     """
     sim_param = SimParam()
     sim_param.S_VALUES = [5, 6, 7]
-    random.seed(sim_param.SEED)
     sim = Simulation(sim_param)
     do_simulation_study(sim, True, True)
 
@@ -33,7 +31,6 @@ def task_2_7_2():
     sim_param = SimParam()
     sim_param.S_VALUES = [5, 6, 7]
     sim_param.SIM_TIME = 1000000
-    random.seed(sim_param.SEED)
     sim = Simulation(sim_param)
     do_simulation_study(sim, True, True)
 
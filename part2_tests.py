@@ -1,10 +1,23 @@
 import unittest
 from simulation import Simulation
+from simparam import SimParam
+from event import CustomerArrival
+from checkpoint import Checkpointer, load_checkpoint, restore, snapshot
+from lindley import LindleyEngine
+from lockstep import LockstepEngine
+from markovchain import MarkovChainEngine, select_engine
+from replication import ReplicationRunner, event_engine, run_replication
+from rng import BlockExponentialRNS, ExponentialRNS, UniformRNS, substream
+from sweep import ParameterSweep, make_grid
 from systemstate import SystemState
 from packet import Packet
 from counter import TimeIndependentCounter, TimeDependentCounter
+import math
 import random
 import numpy
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 
 class DESTestExtended(unittest.TestCase):
@@ -182,6 +195,28 @@ class DESTestExtended(unittest.TestCase):
         self.assertEqual(tic.get_stddev(), numpy.std([3, 2, 5, 0], ddof=1),
                          msg="Error in TimeIndependentCounter. Wrong std dev calculation or wrong counting.")
 
+    def test_streaming_TIC(self):
+        """
+        Test the streaming moments of the TimeIndependentCounter against numpy and scipy.
+        """
+        values = numpy.random.RandomState(0).exponential(3., 10000) + 1e6
+        tic = TimeIndependentCounter(higher_moments=True)
+        kept = TimeIndependentCounter(keep_values=True)
+        for x in values:
+            tic.count(x)
+            kept.count(x)
+        self.assertEqual(tic.values, [], msg="Error in TimeIndependentCounter. Values should not be kept by default.")
+        self.assertRaises(RuntimeError, tic.report_bootstrap_confidence_interval)
+        self.assertEqual(tic.n, len(values), msg="Error in TimeIndependentCounter. Wrong number of values.")
+        self.assertAlmostEqual(tic.get_mean(), numpy.mean(values), delta=1e-6,
+                               msg="Error in TimeIndependentCounter. Wrong streaming mean.")
+        self.assertAlmostEqual(tic.get_var(), numpy.var(values, ddof=1), delta=1e-6,
+                               msg="Error in TimeIndependentCounter. Wrong streaming variance.")
+        self.assertAlmostEqual(tic.get_skewness(), kept.get_skewness(), delta=1e-6,
+                               msg="Error in TimeIndependentCounter. Wrong streaming skewness.")
+        self.assertEqual(kept.get_values(), list(values),
+                         msg="Error in TimeIndependentCounter. Kept values are wrong.")
+
     def test_TDC(self):
         """
         Test the TimeDependentCounter
@@ -203,6 +238,26 @@ class DESTestExtended(unittest.TestCase):
         self.assertEqual(tdc.get_stddev(), 4.0,
                          msg="Error in TimeDeependentCounter. Wrong std dev calculation or wrong counting.")
 
+    def test_TDC_running_sums(self):
+        """
+        Test the compensated running sums, the minimum and the maximum of the TimeDependentCounter.
+        """
+        sim = Simulation(SimParam())
+        tdc = TimeDependentCounter(sim)
+        self.assertIsNone(tdc.get_min(), msg="Error in TimeDependentCounter. No minimum without values.")
+        values = numpy.random.RandomState(1).randint(0, 10, 100000)
+        for i, value in enumerate(values):
+            sim.sim_state.now = (i + 1) * .1
+            tdc.count(value)
+        self.assertEqual(tdc.values, [], msg="Error in TimeDependentCounter. Values should not be kept.")
+        self.assertEqual((tdc.n, tdc.get_min(), tdc.get_max()), (len(values), values.min(), values.max()),
+                         msg="Error in TimeDependentCounter. Wrong number of values, minimum or maximum.")
+        self.assertAlmostEqual(tdc.get_total_time(), len(values) * .1, places=6,
+                               msg="Error in TimeDependentCounter. Wrong total time.")
+        dts = numpy.diff(numpy.arange(len(values) + 1) * .1)
+        self.assertAlmostEqual(tdc.get_area(), math.fsum(values * dts), delta=1e-9,
+                               msg="Error in TimeDependentCounter. Running sum is not compensated.")
+
     def test_do_simulation(self):
         """
         Test whole simulation with different seeds for the correct results. Simulation is reinitialized after every run.
@@ -216,13 +271,372 @@ class DESTestExtended(unittest.TestCase):
             self.assertEqual(DESTestExtended.sim.do_simulation().packets_dropped, results[seed],
                              msg="Error in Simulation. Wrong number of dropped packets for given seed.")
 
-        self.assertLess(len(DESTestExtended.sim.counter_collection.cnt_wt.values), 210,
+        self.assertLess(DESTestExtended.sim.counter_collection.cnt_wt.n, 210,
                         msg="Error in Simulation. Should count less than 210 values for waiting time.")
-        self.assertGreater(len(DESTestExtended.sim.counter_collection.cnt_wt.values), 160,
+        self.assertGreater(DESTestExtended.sim.counter_collection.cnt_wt.n, 160,
                            msg="Error in Simulation. Should count more than 160 values for waiting time.")
-        self.assertGreater(len(DESTestExtended.sim.counter_collection.cnt_ql.values), 5,
+        self.assertGreater(DESTestExtended.sim.counter_collection.cnt_ql.n, 5,
                            msg="Error in Simulation. Should count more than 5 values for queue length.")
 
+    def test_run_stop_conditions(self):
+        """
+        Test the stop conditions of the run kernel.
+        """
+        sim = Simulation(SimParam())
+        sim.do_simulation_n_limit(100)
+        self.assertEqual(sim.counter_collection.cnt_wt.n, 101,
+                         msg="Error in Simulation. Wrong number of served packets for n limited simulation.")
+
+        sim.reset()
+        sim.event_chain.insert(CustomerArrival(sim, 0))
+        sim.run(served_packets=50)
+        self.assertEqual(sim.counter_collection.cnt_wt.n, 50,
+                         msg="Error in Simulation. Wrong number of served packets for run kernel.")
+
+        sim.reset()
+        sim.event_chain.insert(CustomerArrival(sim, 0))
+        sim.run(sim_time=50000)
+        self.assertGreaterEqual(sim.sim_state.now, 50000,
+                                msg="Error in Simulation. Simulation stopped before given simulation time.")
+        self.assertLess(sim.sim_state.now, 60000,
+                        msg="Error in Simulation. Simulation did not stop at given simulation time.")
+
+        sim.reset()
+        sim.event_chain.insert(CustomerArrival(sim, 0))
+        sim.run(predicate=lambda s: s.sim_state.num_blocked_packets > 0)
+        self.assertEqual(sim.sim_state.num_blocked_packets, 1,
+                         msg="Error in Simulation. Simulation did not stop at the given predicate.")
+
+        sim.reset()
+        sim.event_chain.insert(CustomerArrival(sim, 0))
+        sim.run(wall_clock=.05)
+        self.assertLess(sim.wall_time, 1.,
+                        msg="Error in Simulation. Simulation did not stop after the wall-clock budget.")
+
+    def test_object_pool(self):
+        """
+        Test that recycling events and packets does not change the simulation results and reduces allocations.
+        """
+        param = SimParam()
+        param.SIM_TIME = 1000000
+        sim = Simulation(param)
+        sim_pool = Simulation(param, pooling=True)
+        r = sim.do_simulation()
+        r_pool = sim_pool.do_simulation()
+        self.assertEqual([r_pool.mean_waiting_time, r_pool.packets_dropped, r_pool.mean_queue_length],
+                         [r.mean_waiting_time, r.packets_dropped, r.mean_queue_length],
+                         msg="Error in ObjectPool. Recycling objects changes the simulation results.")
+        self.assertEqual(sim.pool.num_reused, 0,
+                         msg="Error in ObjectPool. Objects should not be reused if pooling is disabled.")
+        self.assertLess(sim_pool.pool.num_allocated, 50,
+                        msg="Error in ObjectPool. Too many objects allocated although pooling is enabled.")
+        self.assertEqual(sim.pool.num_allocated, 0,
+                         msg="Error in ObjectPool. Objects should be created directly if pooling is disabled.")
+        # all events except the termination and one packet per arrival are requested from the pool
+        self.assertEqual(sim_pool.pool.num_allocated + sim_pool.pool.num_reused,
+                         sim_pool.event_chain.num_inserted - 1 + r_pool.packets_total,
+                         msg="Error in ObjectPool. Wrong number of requested objects counted.")
+
+    def test_lindley_engine(self):
+        """
+        Test that the Lindley engine produces the same sample path as the event based simulation.
+        """
+        for rho, s in [(.5, 4), (.9, 2), (1.2, 10)]:
+            param = SimParam()
+            param.RHO = rho
+            param.S = s
+            param.SIM_TIME = 1000000
+            sim = Simulation(param)
+            sim_lindley = Simulation(param)
+            engine = LindleyEngine(sim_lindley)
+            for _ in range(2):
+                sim.reset()
+                sim_lindley.reset()
+                r = sim.do_simulation()
+                r_lindley = engine.do_simulation()
+                self.assertEqual([r_lindley.packets_total, r_lindley.packets_dropped],
+                                 [r.packets_total, r.packets_dropped],
+                                 msg="Error in LindleyEngine. Wrong number of packets.")
+                # the waiting times are summed in a different order, hence they may differ in the last bits
+                self.assertAlmostEqual(r_lindley.mean_waiting_time, r.mean_waiting_time,
+                                       delta=1e-9 * abs(r.mean_waiting_time),
+                                       msg="Error in LindleyEngine. Wrong mean waiting time.")
+                self.assertAlmostEqual(r_lindley.system_utilization, r.system_utilization, places=9,
+                                       msg="Error in LindleyEngine. Wrong system utilization.")
+                self.assertAlmostEqual(r_lindley.mean_queue_length, r.mean_queue_length, places=9,
+                                       msg="Error in LindleyEngine. Wrong mean queue length.")
+
+    def test_next_array(self):
+        """
+        Test, that the vectorized blocks of a RNS equal single draws and leave the stream at the same state.
+        """
+        rns = ExponentialRNS(2., 5)
+        single = ExponentialRNS(2., 5)
+        block = rns.next_array(1000)
+        numpy.testing.assert_allclose(block, [single.next() for _ in range(1000)], rtol=1e-15,
+                                      err_msg="Error in ExponentialRNS. Block differs from single draws.")
+        self.assertEqual(rns.next(), single.next(), msg="Error in ExponentialRNS. Stream not continued after block.")
+        rns = UniformRNS(3, 1, 7)
+        single = UniformRNS(3, 1, 7)
+        self.assertEqual(list(rns.next_array(100)), [single.next() for _ in range(100)],
+                         msg="Error in UniformRNS. Block differs from single draws.")
+
+    def test_lockstep_engine(self):
+        """
+        Test the vectorized lockstep engine against the analytic results of the M/M/1/S system.
+        """
+        param = SimParam()
+        param.RHO = .9
+        param.S = 4
+        param.SIM_TIME = 1000000
+        table = LockstepEngine(param, 200, seed=0).do_simulation()
+        self.assertEqual(len(table), 200,
+                         msg="Error in LockstepEngine. Wrong number of replications.")
+        bp = (1 - param.RHO) * param.RHO ** (param.S + 1) / (1 - param.RHO ** (param.S + 2))
+        self.assertAlmostEqual(numpy.mean(table['blocking_probability']), bp, delta=.01,
+                               msg="Error in LockstepEngine. Wrong blocking probability.")
+        self.assertAlmostEqual(numpy.mean(table['system_utilization']), param.RHO * (1 - bp), delta=.01,
+                               msg="Error in LockstepEngine. Wrong system utilization.")
+        self.assertTrue(numpy.all(table['packets_dropped'] + table['packets_served'] == table['packets_total']),
+                        msg="Error in LockstepEngine. Wrong number of packets.")
+
+    def test_markov_chain_engine(self):
+        """
+        Test the selection of the Markov chain engine and its results against the analytic M/M/1/S results.
+        """
+        param = SimParam()
+        param.RHO = .9
+        param.S = 4
+        param.SIM_TIME = 100000000
+        sim = Simulation(param)
+        engine = select_engine(sim)
+        self.assertIsInstance(engine, MarkovChainEngine,
+                              msg="Error in select_engine. Markov chain engine should be used for exponential inputs.")
+        r = engine.do_simulation()
+        bp = (1 - param.RHO) * param.RHO ** (param.S + 1) / (1 - param.RHO ** (param.S + 2))
+        self.assertAlmostEqual(r.blocking_probability, bp, delta=.01,
+                               msg="Error in MarkovChainEngine. Wrong blocking probability.")
+        self.assertAlmostEqual(r.system_utilization, param.RHO * (1 - bp), delta=.02,
+                               msg="Error in MarkovChainEngine. Wrong system utilization.")
+
+        iat = Simulation(param).rng.get_iat()
+        self.assertEqual(sim.rng.get_iat(), iat, msg="Error in MarkovChainEngine. IAT stream should not be used.")
+
+        param.SIM_TIME = 100000
+        result = run_replication(param, 3, select_engine)
+        self.assertEqual(result.mean_waiting_time, MarkovChainEngine(Simulation(param, replication=3)).do_simulation()
+                         .mean_waiting_time, msg="Error in run_replication. Markov chain engine should be selected.")
+        self.assertEqual(result.engine, 'MarkovChainEngine',
+                         msg="Error in run_replication. The engine of the result should be recorded.")
+        self.assertNotEqual(result.mean_waiting_time, run_replication(param, 4, select_engine).mean_waiting_time,
+                            msg="Error in MarkovChainEngine. Replications should use different substreams.")
+        self.assertEqual(run_replication(param, 3).engine, 'Simulation',
+                         msg="Error in run_replication. Event based simulation should be the default.")
+
+        sim.rng.set_st_rns(UniformRNS(0, 2 * param.RHO))
+        self.assertIs(select_engine(sim), sim,
+                      msg="Error in select_engine. Event based simulation should be used for non exponential inputs.")
+
+    def test_replication_runner(self):
+        """
+        Test, that the results of the replication runner do not depend on the number of workers.
+        """
+        param = SimParam()
+        param.SIM_TIME = 100000
+        serial = ReplicationRunner(param, max_workers=1).run(8)
+        parallel = ReplicationRunner(param, max_workers=2, batch_size=3).run(8)
+        self.assertEqual([r.mean_waiting_time for r in serial], [r.mean_waiting_time for r in parallel],
+                         msg="Error in ReplicationRunner. Results depend on the number of workers.")
+        self.assertNotEqual(serial[0].mean_waiting_time, serial[1].mean_waiting_time,
+                            msg="Error in ReplicationRunner. Replications should use different seeds.")
+        continued = ReplicationRunner(param, max_workers=1).run(2, first_index=6)
+        self.assertEqual(continued[0].mean_waiting_time, serial[6].mean_waiting_time,
+                         msg="Error in ReplicationRunner. Replications should be reproducible by index.")
+
+    def test_substreams(self):
+        """
+        Test, that the substreams of a replication are reproducible on their own and independent of each other.
+        """
+        root = numpy.random.SeedSequence(42)
+        self.assertEqual(list(substream(42, 5, 'st').generate_state(4)),
+                         list(root.spawn(6)[5].spawn(2)[1].generate_state(4)),
+                         msg="Error in substream. Substream differs from the spawned seed sequence.")
+
+        param = SimParam()
+        param.SIM_TIME = 100000
+        sims = [Simulation(param, replication=index) for index in range(3)]
+        iats = [sim.rng.get_iat() for sim in sims]
+        self.assertEqual(len(set(iats)), 3, msg="Error in Simulation. Replications should use different streams.")
+        self.assertEqual(Simulation(param, replication=2).rng.get_iat(), iats[2],
+                         msg="Error in Simulation. Replication should be reproducible on its own.")
+        self.assertEqual(Simulation(param, block_rns=True, replication=2).rng.get_iat(),
+                         Simulation(param, block_rns=True, replication=2).rng.get_iat(),
+                         msg="Error in Simulation. Block buffered replication should be reproducible.")
+
+        sim = Simulation(param)
+        sim.init_rng(7)
+        self.assertEqual(sim.do_simulation().mean_waiting_time, run_replication(param, 7, event_engine).mean_waiting_time,
+                         msg="Error in Simulation. Switching the replication gives different streams.")
+
+    def test_parameter_sweep(self):
+        """
+        Test the parameter grid and the result table of the parameter sweep.
+        """
+        param = SimParam()
+        param.SIM_TIME = 100000
+        points = make_grid(param, S=[5, 6], RHO=[.5, .9])
+        self.assertEqual([(p.S, p.RHO) for p in points], [(5, .5), (5, .9), (6, .5), (6, .9)],
+                         msg="Error in make_grid. Wrong parameter combinations.")
+        self.assertEqual(param.S, SimParam().S, msg="Error in make_grid. Parameters should be copied.")
+
+        serial = ParameterSweep(points, 4, max_workers=1).run()
+        parallel = ParameterSweep(points, 4, max_workers=2, batch_size=3).run()
+        self.assertTrue((serial == parallel).all(),
+                        msg="Error in ParameterSweep. Results depend on the number of workers.")
+        self.assertEqual(list(serial['S']), [5, 5, 6, 6], msg="Error in ParameterSweep. Wrong order of the points.")
+        self.assertTrue((serial['replications'] == 4).all(),
+                        msg="Error in ParameterSweep. Wrong number of replications.")
+        self.assertTrue((serial['mean_waiting_time_ci'] > 0).all(),
+                        msg="Error in ParameterSweep. Confidence intervals missing.")
+
+    def test_step_api(self):
+        """
+        Test run_until, run_events and the snapshot generator against an uninterrupted run.
+        """
+        param = SimParam()
+        param.SIM_TIME = 1000000
+        param.RHO = .9
+        result = Simulation(param).do_simulation()
+
+        sim = Simulation(param)
+        sim.run_until(300000)
+        self.assertEqual(sim.sim_state.now, 300000, msg="Error in run_until. Wrong simulation time.")
+        self.assertLessEqual(sim.counter_collection.cnt_ql.last_timestamp, 300000,
+                             msg="Error in run_until. Counters should be updated until the last event before the pause.")
+        self.assertRaises(ValueError, sim.run_until, 200000)
+        num_events = sim.event_chain.num_removed
+        sim.run_events(10)
+        self.assertEqual(sim.event_chain.num_removed, num_events + 10, msg="Error in run_events. Wrong number of events.")
+        sim.run_until(2 * param.SIM_TIME)
+        self.assertTrue(sim.sim_state.finished, msg="Error in run_until. Simulation should be finished.")
+        self.assertEqual(sim.sim_state.now, param.SIM_TIME, msg="Error in run_until. Termination not processed.")
+        self.assertEqual(sim.sim_result.mean_waiting_time, result.mean_waiting_time,
+                         msg="Error in run_until. Results differ from the uninterrupted run.")
+        self.assertEqual([sim.sim_result.events_processed, sim.event_chain.num_inserted,
+                          sim.counter_collection.cnt_ql.n, sim.counter_collection.hist_ql.values],
+                         [result.events_processed, result.sim.event_chain.num_inserted,
+                          result.sim.counter_collection.cnt_ql.n, result.sim.counter_collection.hist_ql.values],
+                         msg="Error in run_until. Pauses should not be counted.")
+
+        sim = Simulation(param)
+        snapshots = list(sim.iter_snapshots(every=100000))
+        self.assertEqual(len(snapshots), 10, msg="Error in iter_snapshots. Wrong number of snapshots.")
+        self.assertIsNone(snapshots[0].sim, msg="Error in iter_snapshots. Snapshots should be detached.")
+        self.assertNotEqual(snapshots[0].mean_queue_length, snapshots[-1].mean_queue_length,
+                            msg="Error in iter_snapshots. Snapshots should change during the run.")
+        self.assertEqual(snapshots[-1].mean_queue_length, result.mean_queue_length,
+                         msg="Error in iter_snapshots. Results differ from the uninterrupted run.")
+
+    def test_concurrent_simulations(self):
+        """
+        Test, that simulations do not share state and can run concurrently in threads.
+        """
+        self.assertIsNot(Simulation().sim_param, Simulation().sim_param,
+                         msg="Error in Simulation. Simulations should not share the default parameters.")
+
+        def run(seed):
+            sim = Simulation()
+            sim.sim_param.SIM_TIME = 200000
+            sim.sim_param.RHO = .9
+            sim.reset()
+            sim.counter_collection.cnt_wt.keep_values = True
+            sim.rng.iat_rns.r.seed(seed)
+            sim.rng.st_rns.r.seed(seed + 1)
+            result = sim.do_simulation()
+            bootstrap = sim.counter_collection.cnt_wt.report_bootstrap_confidence_interval(resample_size=100,
+                                                                                           print_report=False)
+            autocorrelation = list(sim.counter_collection.acnt_wt.autocorrelation())
+            return result.mean_waiting_time, result.packets_total, bootstrap, autocorrelation
+
+        serial = [run(seed) for seed in range(8)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            parallel = list(executor.map(run, range(8)))
+        self.assertEqual(serial, parallel, msg="Error in Simulation. Concurrent simulations interfere.")
+
+    def test_checkpoint(self):
+        """
+        Test, that a run resumed from a checkpoint is identical to an uninterrupted run.
+        """
+        param = SimParam()
+        param.SIM_TIME = 1000000
+        param.RHO = .9
+        param.S = 10
+        sim = Simulation(param, pooling=True)
+        result = sim.do_simulation()
+        expected = (result.mean_waiting_time, result.mean_queue_length, result.system_utilization,
+                    result.packets_total, list(sim.counter_collection.acnt_wt.autocovariance()), sim.rng.get_iat())
+
+        path = os.path.join(tempfile.mkdtemp(), 'checkpoint.bin')
+        checkpointer = Checkpointer(path, every_events=777)
+        Simulation(param, pooling=True).do_simulation(checkpointer=checkpointer)
+        self.assertGreater(checkpointer.num_checkpoints, 0, msg="Error in Checkpointer. No checkpoint written.")
+        sim = load_checkpoint(path)
+        self.assertLess(sim.sim_state.now, param.SIM_TIME, msg="Error in checkpoint. Wrong simulation time.")
+        result = sim.run()
+        self.assertEqual((result.mean_waiting_time, result.mean_queue_length, result.system_utilization,
+                          result.packets_total, list(sim.counter_collection.acnt_wt.autocovariance()),
+                          sim.rng.get_iat()), expected,
+                         msg="Error in checkpoint. Resumed run differs from the uninterrupted run.")
+
+        sim = Simulation(param)
+        sim.insert_first_events()
+        sim.run(served_packets=100)
+        copy = restore(snapshot(sim))
+        self.assertEqual(sim.run(served_packets=100).mean_waiting_time, copy.run(served_packets=100).mean_waiting_time,
+                         msg="Error in snapshot. Restored simulation differs.")
+
+    def test_block_rns(self):
+        """
+        Test the block buffered random number streams and their use in the simulation.
+        """
+        rns = BlockExponentialRNS(2., the_seed=1, block_size=7)
+        values = [rns.next() for _ in range(5)] + list(rns.take(11))
+        rns.skip(9)
+        values.append(rns.next())
+        expected = BlockExponentialRNS(2., the_seed=1, block_size=100).take(26)
+        self.assertEqual(values, list(expected[:16]) + [expected[25]],
+                         msg="Error in BlockExponentialRNS. next, take and skip give different sequences.")
+        state = rns.get_state()
+        first = [rns.next() for _ in range(20)]
+        rns.set_state(state)
+        self.assertEqual([rns.next() for _ in range(20)], first,
+                         msg="Error in BlockExponentialRNS. Restored state gives a different sequence.")
+
+        param = SimParam()
+        param.SIM_TIME = 1000000
+        param.S = 4
+        sim = Simulation(param, block_rns=True)
+        sim_lindley = Simulation(param, block_rns=True)
+        r = sim.do_simulation()
+        r_lindley = LindleyEngine(sim_lindley).do_simulation()
+        self.assertEqual([r_lindley.packets_total, r_lindley.packets_dropped],
+                         [r.packets_total, r.packets_dropped],
+                         msg="Error in LindleyEngine. Wrong results with block buffered streams.")
+        self.assertAlmostEqual(r_lindley.mean_waiting_time, r.mean_waiting_time, delta=1e-9 * abs(r.mean_waiting_time),
+                               msg="Error in LindleyEngine. Wrong mean waiting time with block buffered streams.")
+        self.assertEqual(sim.rng.get_iat(), sim_lindley.rng.get_iat(),
+                         msg="Error in LindleyEngine. Block buffered stream is not advanced correctly.")
+
+        sim = Simulation(param, block_rns=True, warm_start=True)
+        self.assertFalse(hasattr(sim.rng.iat_rns, 'r'),
+                         msg="Error in BlockExponentialRNS. Block streams should not create a random.Random object.")
+        sim_other = Simulation(param, block_rns=True, warm_start=True)
+        self.assertEqual(sim.do_simulation().mean_waiting_time, sim_other.do_simulation().mean_waiting_time,
+                         msg="Error in SystemState. Warm start with block buffered streams is not reproducible.")
+        r = select_engine(Simulation(param, block_rns=True)).do_simulation()
+        self.assertGreater(r.packets_total, 0,
+                           msg="Error in select_engine. Markov chain engine fails with block buffered streams.")
+
 
 if __name__ == '__main__':
     unittest.main()
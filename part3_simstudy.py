@@ -100,7 +100,7 @@ def task_3_3_3():
     sim.sim_param.RHO = .01
     sim.sim_param.SIM_TIME = 100000
 
-    cnt_sys_util = TimeIndependentCounter(name='sys_util')
+    cnt_sys_util = TimeIndependentCounter(name='sys_util', keep_values=True)
 
     for _ in range(sim.sim_param.NO_OF_RUNS):
         sim.reset()
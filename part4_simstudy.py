@@ -2,6 +2,7 @@
 This file should be used to keep all necessary code that is used for the verification and simulation section in part 4
 of the programming assignment. It contains tasks 4.2.1, 4.3.1 and 4.3.2.
 """
+import numpy
 from matplotlib import pyplot as pyplot
 
 from counter import TimeIndependentAutocorrelationCounter
@@ -56,10 +57,12 @@ def task_4_3_2():
         print(f'####### RHO = {rho} #######')
         sim.sim_param.RHO = rho
         sim.reset()
+        cnt_packet_times = sim.counter_collection.cnt_packet_times
+        cnt_packet_times.keep_values = True
         sim.do_simulation()
-        iat = sim.counter_collection.cnt_iat_st.values
-        st = sim.counter_collection.cnt_iat_st.values2
-        sim.counter_collection.cnt_iat_st.report()
+        iat = cnt_packet_times.get_values('iat')
+        st = cnt_packet_times.get_values('st')
+        cnt_packet_times.report([('iat', 'st')])
 
         pyplot.scatter(iat, st, s=2, c='orange')
         pyplot.title(f"Inter-arrival vs Serving Time \nρ={sim.sim_param.RHO}")
@@ -67,9 +70,8 @@ def task_4_3_2():
         pyplot.ylabel("ST [ms]")
         pyplot.show()
 
-        st = sim.counter_collection.cnt_st_syst.values
-        syst = sim.counter_collection.cnt_st_syst.values2
-        sim.counter_collection.cnt_st_syst.report()
+        syst = cnt_packet_times.get_values('syst')
+        cnt_packet_times.report([('st', 'syst')])
 
         pyplot.scatter(st, syst, s=2)
         pyplot.title(f"Serving vs System Time \n ρ={sim.sim_param.RHO}")
@@ -103,7 +105,7 @@ def task_4_3_3():
             results[N][rho] = []
             for i in range(1, 21):
                 cor = acnt_wt.get_auto_cor(i)
-                if cor == None:
+                if numpy.isnan(cor):
                     print(
                         'For some seeds with rho=0.01 and N=100, the variance of the auto covariance is 0. Skipping...')
                     break
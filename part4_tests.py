@@ -1,5 +1,7 @@
 import unittest
+import numpy
 from counter import TimeIndependentAutocorrelationCounter, TimeIndependentCrosscorrelationCounter
+from counter import MultivariateCounter, StreamingAutocorrelationCounter
 
 
 class DESTest(unittest.TestCase):
@@ -42,6 +44,95 @@ class DESTest(unittest.TestCase):
             self.assertAlmostEqual(tiacc.get_auto_cor(lag), results_cor[lag], delta=.05,
                                    msg="Error in TimeIndependentAutocorrelationCounter. Correlation calculation is wrong.")
 
+    def test_auto_correlation_all_lags(self):
+        """
+        Test the auto covariances and correlations of all lags at once against a direct calculation.
+        """
+        tiacc = TimeIndependentAutocorrelationCounter(max_lag=10)
+        values = numpy.random.RandomState(0).exponential(1., 1001)
+        for x in values:
+            tiacc.count(x)
+
+        centered = values - values.mean()
+        direct = [numpy.dot(centered[:len(values) - lag], centered[lag:]) / len(values) for lag in range(11)]
+        numpy.testing.assert_allclose(tiacc.autocovariance(), direct, atol=1e-12,
+                                      err_msg="Error in TimeIndependentAutocorrelationCounter. Wrong auto covariance.")
+        numpy.testing.assert_allclose(tiacc.autocorrelation(5), numpy.array(direct[:6]) / direct[0], atol=1e-12,
+                                      err_msg="Error in TimeIndependentAutocorrelationCounter. Wrong auto correlation.")
+        circular = tiacc.autocorrelation(circular=True)
+        for lag in range(11):
+            self.assertAlmostEqual(circular[lag], tiacc.get_auto_cor(lag), delta=1e-12,
+                                   msg="Error in TimeIndependentAutocorrelationCounter. Circular lags differ.")
+
+        tiacc.count(100.)
+        self.assertEqual(len(tiacc.get_autocovariances(False)), 1002,
+                         msg="Error in TimeIndependentAutocorrelationCounter. Cache not updated after counting.")
+
+    def test_streaming_auto_correlation(self):
+        """
+        Test the bounded memory auto correlation counter against the counter, that keeps all values.
+        """
+        for n in [3, 15, 1000]:
+            tiacc = TimeIndependentAutocorrelationCounter(max_lag=10)
+            sacc = StreamingAutocorrelationCounter(max_lag=10, block_size=64)
+            for x in numpy.random.RandomState(n).exponential(1., n) + 100:
+                tiacc.count(x)
+                sacc.count(x)
+            for circular in [False, True]:
+                numpy.testing.assert_allclose(sacc.autocovariance(circular=circular),
+                                              tiacc.autocovariance(circular=circular), atol=1e-10,
+                                              err_msg="Error in StreamingAutocorrelationCounter. Wrong auto covariance.")
+            self.assertAlmostEqual(sacc.get_auto_cor(2), tiacc.get_auto_cor(2), delta=1e-10,
+                                   msg="Error in StreamingAutocorrelationCounter. Wrong auto correlation.")
+        self.assertEqual(sacc.values, [], msg="Error in StreamingAutocorrelationCounter. Values should not be kept.")
+        self.assertLessEqual(len(sacc.pending), 64, msg="Error in StreamingAutocorrelationCounter. Block not flushed.")
+        self.assertRaises(ValueError, sacc.get_auto_cov, 11)
+
+        for counter in [TimeIndependentAutocorrelationCounter(max_lag=10), StreamingAutocorrelationCounter(max_lag=10)]:
+            for _ in range(5):
+                counter.count(1.)
+            self.assertTrue(numpy.isnan(counter.get_auto_cor(1)),
+                            msg="Error in auto correlation counter. Correlation of a constant series should be nan.")
+
+        for counter in [TimeIndependentAutocorrelationCounter(max_lag=10), StreamingAutocorrelationCounter(max_lag=10)]:
+            counter.count(2.)
+            self.assertTrue(numpy.isnan(counter.get_auto_cor(0)),
+                            msg="Error in auto correlation counter. Correlation of a single value should be nan.")
+            self.assertTrue(numpy.all(numpy.isnan(counter.autocorrelation(circular=True))),
+                            msg="Error in auto correlation counter. Correlation of a single value should be nan.")
+
+    def test_multivariate_counter(self):
+        """
+        Test the streaming co-moments of the multivariate counter and merging of counters.
+        """
+        ticcc = TimeIndependentCrosscorrelationCounter()
+        mvc = MultivariateCounter(('x', 'y'), block_size=2)
+        for x, y in [(1, 5), (2, 7), (6, 3), (3, 3), (4, 5)]:
+            ticcc.count(x, y)
+            mvc.count(x, y)
+        self.assertAlmostEqual(mvc.get_cov('x', 'y'), ticcc.get_cov(), delta=1e-12,
+                               msg="Error in MultivariateCounter. Covariance calculation is wrong.")
+        self.assertAlmostEqual(mvc.get_cor('y', 'x'), numpy.corrcoef([1, 2, 6, 3, 4], [5, 7, 3, 3, 5])[0, 1],
+                               delta=1e-12, msg="Error in MultivariateCounter. Correlation calculation is wrong.")
+
+        data = numpy.random.RandomState(0).exponential(1., (3001, 3)) + [0, 1000, -50]
+        total = MultivariateCounter(('a', 'b', 'c'), block_size=100)
+        parts = [MultivariateCounter(('a', 'b', 'c'), block_size=64) for _ in range(3)]
+        for i, vector in enumerate(data):
+            total.count(*vector)
+            parts[i % 3].count(*vector)
+        merged = MultivariateCounter(('a', 'b', 'c'))
+        for part in parts:
+            merged.merge(part)
+        self.assertEqual(merged.n, len(data), msg="Error in MultivariateCounter. Wrong number of merged vectors.")
+        for counter in [total, merged]:
+            numpy.testing.assert_allclose(counter.get_mean(), data.mean(axis=0), rtol=1e-12,
+                                          err_msg="Error in MultivariateCounter. Wrong mean vector.")
+            numpy.testing.assert_allclose(counter.comoment / (counter.n - 1), numpy.cov(data.T), atol=1e-10,
+                                          err_msg="Error in MultivariateCounter. Wrong co-moment matrix.")
+        self.assertEqual(total.values, [], msg="Error in MultivariateCounter. Values should not be kept.")
+        self.assertRaises(ValueError, MultivariateCounter(('a', 'b', 'c'), keep_values=True).merge, total)
+
 
 if __name__ == '__main__':
     unittest.main()
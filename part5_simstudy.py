@@ -57,8 +57,8 @@ def task_5_2_1():
 
 def task_5_2_2():
     """
-    Run simulation in batches. Start the simulation with running until a customer count of n=100 or (n=1000) and
-    continue to increase the number of customers by dn=n.
+    Run simulation in batches. A single long run is divided into batches of n=100 (or n=1000) served customers
+    (batch means run mode of the simulation).
     Count the blocking proabability for the batch and calculate the confidence interval width of all values, that have
     been counted until now.
     Do this until the desired confidence level is reached and print out the simulation time as well as the number of
@@ -72,33 +72,15 @@ def task_5_2_2():
     sim.sim_param.S = 4
     sim.sim_param.RHO = 0.9
 
-    bp_tic = counter.TimeIndependentCounter(name='block prob.')
-
     for idx1, size in enumerate([100, 1000]):
         for idx2, alpha in enumerate([0.10, 0.05]):
-            bp_tic.reset()
             sim.reset()
-            batches = 0
-            reached_confidence = False
-            while not reached_confidence:
-                sim.sim_result.reset()
-                sim.counter_collection.reset()
-                sim.sim_state.num_blocked_packets = 0
-                sim.sim_state.num_packets = 0
-                sim.sim_state.stop = False
-                if batches == 0:
-                    sim.do_simulation_n_limit(n=size, new_batch=False)
-                    # print(sim.sim_state.now)
-                else:
-                    sim.do_simulation_n_limit(n=size, new_batch=True)
-                bp_tic.count(sim.sim_result.blocking_probability)
-                width = bp_tic.report_confidence_interval(alpha=alpha, print_report=False)
-                if width <= (sim.sim_param.EPSILON):
-                    reached_confidence = True
-                batches += 1
-            bp.append(bp_tic.get_mean())
+            sim.do_simulation_batch_means(size, absolute={'blocking_probability': sim.sim_param.EPSILON},
+                                          alpha=alpha, min_batches=2)
+            batch_means = sim.counter_collection.batch_means
+            bp.append(batch_means.estimates['blocking_probability'].get_mean())
             results[(int(idx1) * 2) + int(idx2)] = sim.sim_state.now
-            batch_list[(int(idx1) * 2) + int(idx2)] = batches
+            batch_list[(int(idx1) * 2) + int(idx2)] = batch_means.get_num_batches()
 
     # print and return results
     print(f'BATCH SIZE:  100; ALPHA: 10%; NUMBER OF BATCHES:{batch_list[0]};'
@@ -1,5 +1,14 @@
 import unittest
 from counter import TimeIndependentCounter
+from counter import SequentialEstimate, RatioEstimate
+from sequential import SequentialStoppingRunner
+from simparam import SimParam
+from simulation import Simulation, RenegingSimulation
+from warmup import mser_truncation
+from markovchain import stationary_distribution
+from event import ServiceCompletion, CustomerArrival, Reneging
+from rng import UniformRNS
+import numpy
 
 class DESTest(unittest.TestCase):
 
@@ -11,7 +20,7 @@ class DESTest(unittest.TestCase):
         """
         Test the basic implementation of the confidence calculation in the time independent counter.
         """
-        tic = TimeIndependentCounter()
+        tic = TimeIndependentCounter(keep_values=True)
         tic.count(0)
         tic.count(3)
         tic.count(5)
@@ -59,6 +68,195 @@ class DESTest(unittest.TestCase):
         self.assertEqual(tic.is_in_bootstrap_confidence_interval(1, resample_size=5000, alpha=.05), False,
                          msg="Error in Confidence interval calculation. Value id in interval, but shouldn't.")
 
+    def test_sequential_stopping(self):
+        """
+        Test the incremental estimate and the sequential stopping runner.
+        """
+        tic = TimeIndependentCounter()
+        estimate = SequentialEstimate()
+        for x in [0, 3, 5, 2, 5, 8, 1, 2, 1]:
+            tic.count(x)
+            estimate.count(x)
+        self.assertAlmostEqual(estimate.get_mean(), tic.get_mean(), delta=1e-12,
+                               msg="Error in SequentialEstimate. Wrong mean.")
+        self.assertAlmostEqual(estimate.get_var(), tic.get_var(), delta=1e-12,
+                               msg="Error in SequentialEstimate. Wrong variance.")
+        self.assertAlmostEqual(estimate.get_half_width(.1), tic.report_confidence_interval(.1, print_report=False),
+                               delta=1e-12, msg="Error in SequentialEstimate. Wrong confidence interval.")
+
+        param = SimParam()
+        param.S = 4
+        param.RHO = .9
+        param.SIM_TIME = 100000
+        relative = {'mean_waiting_time': .1, 'system_utilization': .02}
+        serial = SequentialStoppingRunner(param, relative=relative, max_workers=1)
+        serial.run()
+        parallel = SequentialStoppingRunner(param, relative=relative, max_workers=2, wave_size=5)
+        parallel.run()
+        self.assertEqual(serial.num_replications, parallel.num_replications,
+                         msg="Error in SequentialStoppingRunner. Result depends on the number of workers.")
+        self.assertEqual(serial.num_replications, max(serial.replications_needed.values()),
+                         msg="Error in SequentialStoppingRunner. Stopped too late.")
+        for name, precision in relative.items():
+            estimate = serial.estimates[name]
+            self.assertLessEqual(estimate.get_half_width(param.ALPHA), precision * estimate.get_mean(),
+                                 msg="Error in SequentialStoppingRunner. Precision not met.")
+            self.assertEqual(estimate.get_mean(), parallel.estimates[name].get_mean(),
+                             msg="Error in SequentialStoppingRunner. Result depends on the number of workers.")
+
+    def test_batch_means(self):
+        """
+        Test the batch means run mode with fixed and growing batch sizes.
+        """
+        param = SimParam()
+        param.S = 4
+        param.RHO = .9
+        sim = Simulation(param)
+        sim.do_simulation_batch_means(100, absolute={'blocking_probability': 0}, max_batches=50)
+        batch_means = sim.counter_collection.batch_means
+        self.assertEqual(batch_means.get_num_batches(), 50,
+                         msg="Error in batch means. Run should stop after max_batches batches.")
+        self.assertEqual(sim.counter_collection.cnt_wt.n, 5000,
+                         msg="Error in batch means. Wrong number of served packets.")
+        self.assertAlmostEqual(batch_means.estimates['mean_waiting_time'].get_mean(), sim.sim_result.mean_waiting_time,
+                               delta=1e-6, msg="Error in batch means. Wrong mean waiting time.")
+
+        sim = Simulation(param)
+        sim.do_simulation_batch_means(100, relative={'mean_waiting_time': .05}, grow=True, num_batches=10)
+        batch_means = sim.counter_collection.batch_means
+        half_width = batch_means.get_half_width('mean_waiting_time')
+        self.assertLessEqual(half_width, .05 * batch_means.estimates['mean_waiting_time'].get_mean(),
+                             msg="Error in batch means. Precision not met.")
+        self.assertLess(batch_means.get_num_batches(), 20, msg="Error in batch means. Batches should be merged.")
+        self.assertEqual(batch_means.batch_size % 100, 0, msg="Error in batch means. Wrong batch size.")
+
+        sim = Simulation(param)
+        sim.do_simulation_batch_means(100, absolute={'blocking_probability': 0}, max_batches=200, grow=True,
+                                      num_batches=10)
+        batch_means = sim.counter_collection.batch_means
+        served = sim.counter_collection.cnt_wt.n
+        self.assertTrue(20000 <= served < 20000 + batch_means.batch_size,
+                        msg="Error in batch means. Run should stop after max_batches batches, even if they are merged.")
+        self.assertLess(batch_means.get_num_batches(), 20, msg="Error in batch means. Batches should be merged.")
+
+    def test_warmup_detection(self):
+        """
+        Test the MSER truncation point and the online warm-up detection.
+        """
+        z = numpy.concatenate((numpy.linspace(10, 1, 10), numpy.ones(40) + .1 * (-1) ** numpy.arange(40)))
+        self.assertEqual(mser_truncation(z), 9, msg="Error in MSER. Wrong truncation point.")
+        self.assertIsNone(mser_truncation(numpy.linspace(10, 1, 50)),
+                          msg="Error in MSER. No truncation point should be found for a trend.")
+
+        param = SimParam()
+        param.S = 10000
+        param.RHO = .9
+        param.SIM_TIME = 1000000
+        sim = Simulation(param, warmup_detection=True)
+        result = sim.do_simulation()
+        self.assertGreater(result.warmup_time, 0, msg="Error in warm-up detection. Warm-up should be detected.")
+        self.assertIsNone(sim.counter_collection.warmup, msg="Error in warm-up detection. Detector not removed.")
+        self.assertEqual(sim.counter_collection.cnt_ql.first_timestamp, result.warmup_time,
+                         msg="Error in warm-up detection. Counters should start after the warm-up period.")
+        self.assertLessEqual(result.truncation_time, result.warmup_time,
+                             msg="Error in warm-up detection. Truncation point should be before the detection.")
+        self.assertEqual(result.warmup_packets % 5, 0, msg="Error in warm-up detection. Wrong number of packets.")
+        # the same sample path without warm-up detection serves warmup_packets packets until the detection
+        sim_plain = Simulation(param)
+        sim_plain.start_run()
+        sim_plain.run(sim_time=result.warmup_time)
+        self.assertEqual(sim_plain.counter_collection.cnt_wt.n, result.warmup_packets,
+                         msg="Error in warm-up detection. Wrong number of deleted packets.")
+
+        sim = Simulation(param)
+        self.assertEqual(sim.do_simulation().warmup_time, 0,
+                         msg="Error in warm-up detection. Warm-up should only be deleted if enabled.")
+
+    def test_warm_start(self):
+        """
+        Test the warm start of the system state from the stationary distribution.
+        """
+        p = stationary_distribution(.9, 4)
+        self.assertAlmostEqual(sum(p), 1, delta=1e-12, msg="Error in stationary distribution. Wrong sum.")
+        self.assertAlmostEqual(p[5], (1 - .9) * .9 ** 5 / (1 - .9 ** 6), delta=1e-12,
+                               msg="Error in stationary distribution. Wrong blocking probability.")
+
+        param = SimParam()
+        param.S = 20
+        param.RHO = .9
+        busy = 0
+        for replication in range(20):
+            sim = Simulation(param, warm_start=True, pooling=True, replication=replication)
+            sim.insert_first_events()
+            n = sim.system_state.num_initial_packets
+            self.assertEqual(sim.pool.num_allocated, len(sim.event_chain) + n,
+                             msg="Error in warm start. Initial events and packets should come from the object pool.")
+            self.assertEqual(sim.system_state.get_queue_length(), max(n - 1, 0),
+                             msg="Error in warm start. Wrong queue length.")
+            self.assertEqual(sim.system_state.server_busy, n > 0, msg="Error in warm start. Wrong server state.")
+            completions = [e for e in sim.event_chain.event_list if isinstance(e[-1], ServiceCompletion)]
+            self.assertEqual(len(completions), int(n > 0),
+                             msg="Error in warm start. Service completion not scheduled consistently.")
+            busy += n > 0
+
+            sim.run(served_packets=n + 10)
+            self.assertEqual(sim.counter_collection.cnt_wt.n, 10,
+                             msg="Error in warm start. Initial packets should not be counted.")
+        self.assertGreater(busy, 10, msg="Error in warm start. System should mostly be busy for rho = .9.")
+
+        sim = Simulation(param, warm_start=True)
+        sim.insert_first_events()
+        arrivals = [e[-1].timestamp for e in sim.event_chain.event_list if isinstance(e[-1], CustomerArrival)]
+        self.assertEqual(arrivals, [Simulation(param).rng.get_iat() * 1000],
+                         msg="Error in warm start. The initial state should not shift the inter-arrival times.")
+
+        for replication in range(5):
+            sim = RenegingSimulation(param, warm_start=True, replication=replication)
+            sim.insert_first_events()
+            reneging = [e[-1].packet for e in sim.event_chain.event_list if isinstance(e[-1], Reneging)]
+            self.assertCountEqual(reneging, sim.system_state.buffer.buffer,
+                                  msg="Error in warm start. Every waiting packet should have a Reneging event.")
+
+    def test_regenerative(self):
+        """
+        Test the ratio estimate and the regenerative run mode.
+        """
+        ratio = RatioEstimate()
+        ys = [3, 0, 7, 2, 9, 4]
+        xs = [2, 1, 4, 1, 5, 3]
+        for y, x in zip(ys, xs):
+            ratio.count(y, x)
+        r = sum(ys) / float(sum(xs))
+        self.assertAlmostEqual(ratio.get_ratio(), r, delta=1e-12, msg="Error in RatioEstimate. Wrong ratio.")
+        tic = TimeIndependentCounter()
+        for y, x in zip(ys, xs):
+            tic.count(y - r * x)
+        half_width = tic.report_confidence_interval(.1, print_report=False) / numpy.mean(xs)
+        self.assertAlmostEqual(ratio.get_half_width(.1), half_width, delta=1e-9,
+                               msg="Error in RatioEstimate. Wrong confidence interval.")
+
+        param = SimParam()
+        param.S = 4
+        param.RHO = .9
+        sim = Simulation(param)
+        sim.do_simulation_regenerative(relative={'mean_queue_length': .1})
+        estimator = sim.counter_collection.regenerative
+        p = stationary_distribution(param.RHO, param.S)
+        mean_queue_length = sum(n * p[n] for n in range(len(p))) - (1 - p[0])
+        self.assertLessEqual(estimator.get_half_width('mean_queue_length'),
+                             .1 * estimator.estimates['mean_queue_length'].get_mean(),
+                             msg="Error in regenerative estimator. Precision not met.")
+        self.assertAlmostEqual(estimator.estimates['mean_queue_length'].get_mean(), mean_queue_length,
+                               delta=3 * estimator.get_half_width('mean_queue_length'),
+                               msg="Error in regenerative estimator. Wrong mean queue length.")
+        self.assertGreater(estimator.first_regeneration, 0, msg="Error in regenerative estimator. No regeneration.")
+
+        sim = Simulation(param)
+        sim.rng.set_iat_rns(UniformRNS(0, 2))
+        self.assertRaises(TypeError, sim.do_simulation_regenerative)
+        self.assertIsNone(sim.counter_collection.regenerative,
+                          msg="Error in regenerative estimator. Only exponential inter-arrival times are supported.")
+
 
 if __name__ == '__main__':
     unittest.main()
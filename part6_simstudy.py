@@ -19,9 +19,9 @@ def task_6_2_1():
     """
     alpha = .1
     values = []
-    np.random.seed(0)
+    rng = np.random.RandomState(0)
     for _ in range(100):
-        values.append(np.random.normal(0, 1))
+        values.append(rng.normal(0, 1))
 
     emp_n, emp_x = np.histogram(values, bins=100, range=(-5, 5))
 
@@ -46,7 +46,7 @@ def task_6_3_2():
     sim.sim_param.RHO = .01
     sim.sim_param.SIM_TIME = 100000
 
-    cnt_sys_util = TimeIndependentCounter(name='sys_util')
+    cnt_sys_util = TimeIndependentCounter(name='sys_util', keep_values=True)
 
     for _ in range(100):
         sim.reset()
@@ -0,0 +1,84 @@
+from counter import RatioEstimate
+from rng import ExponentialRNS
+from stopping import PeriodEstimator
+
+
+class RegenerativeEstimator(PeriodEstimator):
+    """
+    Collects regeneration cycles during a single simulation run.
+
+    The system regenerates whenever the server becomes idle with an empty queue, which is detected in
+    ServiceCompletion.process. For memoryless inter-arrival times, the cycles between two regeneration points are
+    i.i.d., so ratio estimators of the per-cycle sums give valid confidence intervals from a single run, without
+    warm-up deletion or independent replications. Per cycle, only a few sums are accumulated (see PeriodEstimator),
+    and the cycles are added to running ratio estimates, hence the memory is constant.
+    For other inter-arrival times, the time since the last arrival is part of the state, hence an empty system is no
+    regeneration point and the estimator can not be created.
+
+    The cycle from the start of the run until the first regeneration point is discarded, because the first customer
+    arrives at time 0.
+    """
+
+    # name of the estimates in error messages
+    estimate_type = 'regenerative estimate'
+
+    def __init__(self, sim, absolute=None, relative=None, alpha=None, min_cycles=10, max_cycles=10000000):
+        """
+        Initialize the estimator.
+        :param sim: the simulation, whose run is divided into regeneration cycles
+        :param absolute: dictionary of absolute precisions per metric,
+        default: {'blocking_probability': sim_param.EPSILON} if relative is not given either
+        :param relative: dictionary of relative precisions per metric, e.g., {'mean_waiting_time': .05}
+        :param alpha: significance level of the confidence intervals (default: sim_param.ALPHA)
+        :param min_cycles: minimum number of cycles before the precision is checked
+        :param max_cycles: the run is stopped after this number of cycles, even if the precision is not met
+        """
+        if not isinstance(sim.rng.iat_rns, ExponentialRNS):
+            raise TypeError("RegenerativeEstimator requires exponential inter-arrival times.")
+        self.init_rule(sim.sim_param, absolute, relative, alpha)
+        self.sim = sim
+        self.min_cycles = max(2, min_cycles)
+        self.max_cycles = max_cycles
+        self.estimates = {}
+        for name in self.metrics:
+            self.estimates[name] = RatioEstimate(name=name)
+        self.first_regeneration = None
+        self.start_period()
+
+    def regenerate(self):
+        """
+        Complete the current cycle at a regeneration point, check the stopping rule and start the next cycle.
+        Called by ServiceCompletion.process, if the server becomes idle with an empty queue.
+        """
+        sim_state = self.sim.sim_state
+        if self.first_regeneration is None:
+            self.first_regeneration = sim_state.now
+        else:
+            duration = sim_state.now - self.start_time
+            packets = sim_state.num_packets - self.start_packets
+            self.estimates['blocking_probability'].count(sim_state.num_blocked_packets - self.start_blocked, packets)
+            self.estimates['mean_waiting_time'].count(self.sum_wt, self.served)
+            self.estimates['system_utilization'].count(self.area_busy, duration)
+            self.estimates['mean_queue_length'].count(self.area_ql, duration)
+            if self.is_done():
+                sim_state.stop = True
+        self.start_period()
+
+    def get_num_cycles(self):
+        """
+        :return: number of completed cycles
+        """
+        return self.estimates['blocking_probability'].n
+
+    def is_done(self):
+        """
+        Check the stopping rule.
+        :return: true, if all requested metrics meet their precision or max_cycles is reached
+        """
+        return self.is_met(self.get_num_cycles(), self.min_cycles, self.max_cycles)
+
+    def report(self):
+        """
+        Print the ratio estimates and their confidence intervals.
+        """
+        self.report_estimates('Regenerative estimates: ' + str(self.get_num_cycles()) + ' cycles')
@@ -0,0 +1,98 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from counter import TimeIndependentCounter
+from simresult import RESULT_DTYPE
+from simulation import Simulation
+
+
+def event_engine(sim):
+    """
+    Engine factory, that runs the event based simulation itself, e.g., for per-packet statistics.
+    :param sim: simulation object
+    :return: the simulation
+    """
+    return sim
+
+
+def run_replication(sim_param, index, engine=None):
+    """
+    Run a single replication with the independent substreams of its index (see rng.substream).
+    This is a module level function, so that it can be sent to worker processes.
+    :param sim_param: simulation parameters
+    :param index: index of the replication
+    :param engine: optional callable, that creates an engine with do_simulation() for a simulation, e.g.,
+    LindleyEngine or select_engine (MarkovChainEngine for exponential inputs). Defaults to event_engine, i.e., the
+    event based simulation. The engine, that has produced the result, is recorded in SimResult.engine.
+    :return: SimResult object, that is detached from its simulation
+    """
+    sim = Simulation(sim_param, replication=index)
+    result = (event_engine if engine is None else engine)(sim).do_simulation()
+    result.sim = None
+    return result
+
+
+def run_replication_batch(sim_param, indices, engine=None):
+    """
+    Run several replications in one worker to reduce the communication overhead.
+    :return: list of SimResult objects in the order of indices
+    """
+    return [run_replication(sim_param, index, engine) for index in indices]
+
+
+class ReplicationRunner(object):
+    """
+    Runs independent replications of a simulation in a pool of worker processes.
+
+    Every replication gets its own random number streams, which are derived from SimParam.SEED and the index of the
+    replication.
+    Hence, the results do not depend on the number of workers or on the order in which the replications finish.
+    """
+
+    def __init__(self, sim_param, max_workers=None, engine=None, batch_size=None):
+        """
+        Initialize the runner.
+        :param sim_param: simulation parameters of all replications
+        :param max_workers: number of worker processes (default: number of CPUs). With max_workers=1, the
+        replications are run in the calling process.
+        :param engine: optional engine factory, see run_replication (default: the event based simulation)
+        :param batch_size: number of replications per task (default: chosen from the number of replications)
+        """
+        self.sim_param = sim_param
+        self.max_workers = max_workers
+        self.engine = engine
+        self.batch_size = batch_size
+
+    def run(self, replications, first_index=0):
+        """
+        Run the given number of replications.
+        :param replications: number of replications
+        :param first_index: index of the first replication, e.g., for continuing a study
+        :return: list of SimResult objects, ordered by the index of the replication
+        """
+        indices = list(range(first_index, first_index + replications))
+        if self.max_workers == 1:
+            return run_replication_batch(self.sim_param, indices, self.engine)
+
+        batch_size = self.batch_size
+        if batch_size is None:
+            batch_size = max(1, replications // (4 * (self.max_workers or os.cpu_count() or 1)))
+        batches = [indices[i:i + batch_size] for i in range(0, replications, batch_size)]
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(run_replication_batch, self.sim_param, batch, self.engine)
+                       for batch in batches]
+            return [result for future in futures for result in future.result()]
+
+    def run_counters(self, replications, first_index=0):
+        """
+        Run the given number of replications and aggregate the results.
+        :return: dictionary of TimeIndependentCounters, one per field of the result table (see RESULT_DTYPE)
+        """
+        counters = {}
+        for name in RESULT_DTYPE.names:
+            counters[name] = TimeIndependentCounter(name=name)
+        for result in self.run(replications, first_index):
+            for name in RESULT_DTYPE.names:
+                counters[name].count(getattr(result, name))
+        return counters
@@ -3,23 +3,54 @@ from random import Random
 
 import numpy
 
+# kinds of random number streams of a replication, the position of a kind is the last element of its spawn key
+STREAM_KINDS = ('iat', 'st', 'patience', 'jumps', 'warmstart')
+
+
+def substream(seed, replication, kind):
+    """
+    Return the seed sequence of an independent random number stream of a replication.
+    The sequence is the same as SeedSequence(seed).spawn(...)[replication].spawn(...)[i] for the position i of kind in
+    STREAM_KINDS, but it is computed directly from its spawn key. Hence, every replication can be reproduced on its
+    own, without generating the streams of the replications before it.
+    :param seed: base seed of the study (e.g. SimParam.SEED)
+    :param replication: index of the replication
+    :param kind: kind of the stream, one of STREAM_KINDS
+    :return: numpy SeedSequence, which can be passed as seed to every RNS
+    """
+    return numpy.random.SeedSequence(seed, spawn_key=(replication, STREAM_KINDS.index(kind)))
+
+
+def python_seed(the_seed):
+    """
+    Convert a seed for random.Random. Seed sequences are converted to an integer of 256 bits, other seeds are
+    returned unchanged.
+    :param the_seed: seed, seed sequence or None
+    :return: seed for random.Random
+    """
+    if isinstance(the_seed, numpy.random.SeedSequence):
+        return int.from_bytes(the_seed.generate_state(4, numpy.uint64).tobytes(), 'little')
+    return the_seed
+
 
 class RNG(object):
     """
     Class RNG contains two random number streams, one for IAT and one for ST.
 
     Both RNS can be set during initialization or separately. The next random numbers are generated by the functions
-    get_iat() or get_st().
+    get_iat() or get_st(). Optionally, a third RNS for the patience times of impatient customers can be set.
     """
 
-    def __init__(self, rns1, rns2):
+    def __init__(self, rns1, rns2, rns3=None):
         """
         Initialize a RNG object with two RNS given.
         :param rns1: represents the RNS for the inter-arrival times.
         :param rns2: represents the RNS for the service times.
+        :param rns3: represents the (optional) RNS for the patience times.
         """
         self.iat_rns = rns1
         self.st_rns = rns2
+        self.patience_rns = rns3
 
     def set_iat_rns(self, rns1):
         """
@@ -33,6 +64,12 @@ class RNG(object):
         """
         self.st_rns = rns2
 
+    def set_patience_rns(self, rns3):
+        """
+        Set a new RNS for the patience times.
+        """
+        self.patience_rns = rns3
+
     def get_iat(self):
         """
         Return a new sample of the IAT RNS
@@ -45,6 +82,12 @@ class RNG(object):
         """
         return self.st_rns.next()
 
+    def get_patience(self):
+        """
+        Return a new sample of the patience RNS
+        """
+        return self.patience_rns.next()
+
 
 class RNS(object):
     """
@@ -56,10 +99,10 @@ class RNS(object):
 
     def __init__(self, the_seed=None):
         """
-        Initialize the general RNS with an optional seed.
+        Initialize the general RNS with an optional seed or seed sequence (see substream).
         All further initialization is done in subclass.
         """
-        self.r = Random(the_seed)
+        self.r = Random(python_seed(the_seed))
 
     def set_parameters(self, *args):
         NotImplementedError("Implement in subclass")
@@ -70,6 +113,55 @@ class RNS(object):
         """
         return 0
 
+    def next_array(self, n):
+        """
+        Generate the next n random numbers at once.
+        The values and the state of the stream afterwards are the same as for n calls of next().
+        :param n: number of random numbers
+        :return: numpy array of length n
+        """
+        return numpy.fromiter((self.next() for _ in range(n)), dtype=float, count=n)
+
+    def random_array(self, n):
+        """
+        Draw the next n uniformly distributed numbers in [0, 1) of the stream at once.
+        The Mersenne Twister state of the stream is loaded into a NumPy Generator (MT19937), which produces the same
+        numbers as n calls of random(), and the state is written back afterwards. Hence, the stream continues as if
+        the numbers had been drawn one by one.
+        :param n: number of random numbers
+        :return: numpy array of length n
+        """
+        version, internal_state, gauss_next = self.r.getstate()
+        bit_generator = numpy.random.MT19937()
+        bit_generator.state = {'bit_generator': 'MT19937',
+                               'state': {'key': numpy.array(internal_state[:-1], dtype=numpy.uint32),
+                                         'pos': internal_state[-1]}}
+        values = numpy.random.Generator(bit_generator).random(n)
+        state = bit_generator.state['state']
+        self.r.setstate((version, tuple(state['key'].tolist()) + (int(state['pos']),), gauss_next))
+        return values
+
+    def skip(self, n):
+        """
+        Advance the stream by n random numbers without generating them.
+        Every random number of the implemented RNS consumes one call of random(), i.e., two 32 bit words of the
+        Mersenne Twister, hence the same state is reached by drawing 64 * n random bits at once.
+        :param n: number of random numbers to skip
+        """
+        self.r.getrandbits(64 * n)
+
+    def get_state(self):
+        """
+        :return: state of the stream, which can be restored with set_state
+        """
+        return self.r.getstate()
+
+    def set_state(self, state):
+        """
+        Restore a state of the stream, that has been returned by get_state.
+        """
+        self.r.setstate(state)
+
 
 class ExponentialRNS(RNS):
     """
@@ -99,6 +191,14 @@ class ExponentialRNS(RNS):
         """
         return -math.log(self.r.random()) * self.mean
 
+    def next_array(self, n):
+        """
+        Generate the next n random numbers at once from a block of uniform numbers (see random_array).
+        The values are the same as for n calls of next(), except for the rounding of the logarithm, which may differ
+        in the last bit, and the stream continues at the same state.
+        """
+        return -numpy.log(self.random_array(n)) * self.mean
+
 
 class UniformRNS(RNS):
     """
@@ -131,3 +231,163 @@ class UniformRNS(RNS):
         Generate the next random number using the inverse transform method.
         """
         return self.lower_bound + self.width * self.r.random()
+
+    def next_array(self, n):
+        """
+        Generate the next n random numbers at once from a block of uniform numbers (see random_array), equal to n
+        calls of next().
+        """
+        return self.lower_bound + self.width * self.random_array(n)
+
+
+class BlockRNS(object):
+    """
+    Mixin for random number streams, that are backed by a NumPy Generator.
+
+    Standardized variates (e.g. exponential with mean 1) are drawn in blocks of block_size and served from a buffer,
+    so that the cost of a variate is a list access instead of several Python calls. The parameters of the
+    distribution are applied when a variate is served, hence they can be changed at any time. The sequence of
+    variates only depends on the seed: next(), take(n) and skip(n) can be mixed, because consecutive blocks of a
+    Generator are the same as one large block.
+    Block streams do not create the random.Random object r of RNS, all numbers are drawn from the Generator.
+    Subclasses implement draw_block(n) and transform(values).
+    """
+
+    # default number of variates per block
+    default_block_size = 4096
+
+    def init_buffer(self, the_seed, block_size):
+        """
+        Create the Generator and the empty buffer.
+        :param the_seed: optional seed of the Generator
+        :param block_size: number of variates per block, default: default_block_size
+        """
+        self.generator = numpy.random.default_rng(the_seed)
+        self.block_size = block_size or self.default_block_size
+        self.buffer = []
+        self.index = 0
+
+    def take(self, n):
+        """
+        Return the next n variates at once, e.g., for vectorized engines. The sequence is the same as for n calls
+        of next().
+        :param n: number of variates
+        :return: numpy array of length n
+        """
+        rest = numpy.array(self.buffer[self.index:self.index + n], dtype=float)
+        self.index += len(rest)
+        if len(rest) < n:
+            rest = numpy.concatenate((rest, self.draw_block(n - len(rest))))
+        return self.transform(rest)
+
+    def next_array(self, n):
+        """
+        Generate the next n random numbers at once, equal to take(n).
+        """
+        return self.take(n)
+
+    def skip(self, n):
+        """
+        Advance the stream by n variates without using them.
+        :param n: number of variates to skip
+        """
+        available = len(self.buffer) - self.index
+        if n <= available:
+            self.index += n
+        else:
+            self.index = len(self.buffer)
+            self.draw_block(n - available)
+
+    def get_state(self):
+        """
+        :return: state of the stream, which can be restored with set_state
+        """
+        return self.generator.bit_generator.state, list(self.buffer), self.index
+
+    def set_state(self, state):
+        """
+        Restore a state of the stream, that has been returned by get_state.
+        """
+        self.generator.bit_generator.state, self.buffer, self.index = state[0], list(state[1]), state[2]
+
+
+class BlockExponentialRNS(BlockRNS, ExponentialRNS):
+    """
+    Exponentially distributed random numbers from a NumPy Generator, served from a buffer (see BlockRNS).
+    The sequence differs from the one of ExponentialRNS with the same seed.
+    :param lambda_x: the inverse of the mean of the exponential distribution
+    :param the_seed: optional seed for the random number stream
+    :param block_size: optional number of variates per block
+    """
+
+    def __init__(self, lambda_x, the_seed=None, block_size=None):
+        """
+        Initialize the block buffered Exponential RNS and set the parameters.
+        """
+        self.mean = 0
+        self.set_parameters(lambda_x)
+        self.init_buffer(the_seed, block_size)
+
+    def next(self):
+        """
+        Return the next random number from the buffer, a new block is drawn if the buffer is used up.
+        """
+        index = self.index
+        if index >= len(self.buffer):
+            self.buffer = self.generator.standard_exponential(self.block_size).tolist()
+            index = 0
+        self.index = index + 1
+        return self.buffer[index] * self.mean
+
+    def draw_block(self, n):
+        """
+        :return: numpy array of n exponentially distributed numbers with mean 1
+        """
+        return self.generator.standard_exponential(n)
+
+    def transform(self, values):
+        """
+        :return: the standardized values scaled to the mean of the stream
+        """
+        return values * self.mean
+
+
+class BlockUniformRNS(BlockRNS, UniformRNS):
+    """
+    Uniformly distributed random numbers from a NumPy Generator, served from a buffer (see BlockRNS).
+    The sequence differs from the one of UniformRNS with the same seed.
+    :param a: the lower bound of the uniform distribution
+    :param b: the upper bound of the uniform distribution
+    :param the_seed: optional seed for the random number stream
+    :param block_size: optional number of variates per block
+    """
+
+    def __init__(self, a, b, the_seed=None, block_size=None):
+        """
+        Initialize the block buffered Uniform RNS and set the parameters.
+        """
+        self.set_parameters(a, b)
+        self.init_buffer(the_seed, block_size)
+
+    def next(self):
+        """
+        Return the next random number from the buffer, a new block is drawn if the buffer is used up.
+        """
+        index = self.index
+        if index >= len(self.buffer):
+            self.buffer = self.generator.random(self.block_size).tolist()
+            index = 0
+        self.index = index + 1
+        return self.lower_bound + self.width * self.buffer[index]
+
+    def draw_block(self, n):
+        """
+        :return: numpy array of n uniformly distributed numbers in [0, 1)
+        """
+        return self.generator.random(n)
+
+    def transform(self, values):
+        """
+        :return: the standardized values mapped to the bounds of the stream
+        """
+        return self.lower_bound + self.width * values
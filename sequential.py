@@ -0,0 +1,124 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from counter import SequentialEstimate
+from replication import run_replication_batch
+from stopping import PrecisionStoppingRule
+
+
+class SequentialStoppingRunner(PrecisionStoppingRule):
+    """
+    Runs replications until the confidence intervals of all requested metrics are small enough.
+
+    The replications are started in parallel waves on a pool of worker processes, but their results are added to the
+    estimates in the order of the replication index and the stopping rule is checked after every single replication.
+    Replications of the last wave beyond the stopping point are discarded. Hence, the result is the same as for a
+    serial run and it does not depend on the number of workers. Any SimResult field can be requested as metric (see
+    PrecisionStoppingRule for the stopping rule).
+    """
+
+    def __init__(self, sim_param, absolute=None, relative=None, alpha=None, min_replications=3,
+                 max_replications=100000, wave_size=None, max_workers=None, engine=None):
+        """
+        Initialize the runner.
+        :param sim_param: simulation parameters of all replications
+        :param absolute: dictionary of absolute precisions per SimResult field,
+        default: {'blocking_probability': sim_param.EPSILON} if relative is not given either
+        :param relative: dictionary of relative precisions per SimResult field, e.g., {'mean_waiting_time': .05}
+        :param alpha: significance level of the confidence intervals (default: sim_param.ALPHA)
+        :param min_replications: minimum number of replications before the precision is checked
+        :param max_replications: the runner stops after this number of replications, even if the precision is not met
+        :param wave_size: number of replications started at once (default: 2 per worker)
+        :param max_workers: number of worker processes (default: number of CPUs). With max_workers=1, the
+        replications are run in the calling process.
+        :param engine: optional engine factory, see run_replication (default: the event based simulation)
+        """
+        self.init_rule(sim_param, absolute, relative, alpha)
+        self.sim_param = sim_param
+        self.min_replications = max(2, min_replications)
+        self.max_replications = max_replications
+        self.max_workers = max_workers
+        self.wave_size = wave_size or 2 * (max_workers or os.cpu_count() or 1)
+        self.engine = engine
+        self.reset()
+
+    def reset(self):
+        """
+        Reset the estimates, e.g., for running the study again.
+        """
+        names = self.get_requested_metrics()
+        self.estimates = {}
+        for name in names:
+            self.estimates[name] = SequentialEstimate(name=name)
+        self.replications_needed = dict.fromkeys(names)
+        self.num_replications = 0
+        self.results = []
+
+    def add_result(self, result):
+        """
+        Add the result of the next replication and check the stopping rule.
+        :param result: SimResult object of the replication
+        :return: true, if all metrics meet their precision or max_replications is reached
+        """
+        self.results.append(result)
+        self.num_replications += 1
+        for name, estimate in self.estimates.items():
+            estimate.count(getattr(result, name))
+
+        if self.num_replications < self.min_replications:
+            return False
+        for name in self.estimates:
+            if self.is_precise(name):
+                if self.replications_needed[name] is None:
+                    self.replications_needed[name] = self.num_replications
+            else:
+                # the precision has to be met until the end, not only once
+                self.replications_needed[name] = None
+        return self.is_met(self.num_replications, self.min_replications, self.max_replications)
+
+    def run(self):
+        """
+        Run replications in waves until all metrics meet their precision or max_replications is reached.
+        :return: dictionary of SequentialEstimates per metric
+        """
+        self.reset()
+        if self.max_workers == 1:
+            self.run_waves(None)
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                self.run_waves(executor)
+        return self.estimates
+
+    def run_waves(self, executor):
+        """
+        Run waves of replications until the stopping rule is met.
+        :param executor: pool of worker processes, or None for running the replications in the calling process
+        """
+        done = False
+        while not done and self.num_replications < self.max_replications:
+            first = self.num_replications
+            indices = list(range(first, min(first + self.wave_size, self.max_replications)))
+            if executor is None:
+                wave = [run_replication_batch(self.sim_param, [index], self.engine) for index in indices]
+            else:
+                num_tasks = self.max_workers or os.cpu_count() or 1
+                chunk = max(1, math.ceil(len(indices) / num_tasks))
+                futures = [executor.submit(run_replication_batch, self.sim_param, indices[i:i + chunk], self.engine)
+                           for i in range(0, len(indices), chunk)]
+                wave = [future.result() for future in futures]
+            for result in [result for batch in wave for result in batch]:
+                if self.add_result(result):
+                    done = True
+                    break
+
+    def report(self):
+        """
+        Print the estimates, their confidence intervals and the number of replications needed per metric.
+        """
+        print('Sequential stopping after ' + str(self.num_replications) + ' replications (alpha = ' +
+              str(self.alpha) + '):')
+        for name, estimate in self.estimates.items():
+            print('\t' + name + ': mean = ' + str(estimate.get_mean()) + ', half width = ' +
+                  str(estimate.get_half_width(self.alpha)) + ', replications needed = ' +
+                  str(self.replications_needed[name]))
@@ -26,10 +26,14 @@ class SimParam(object):
         # maximal allowed packets to drop in one run (SIM_TIME)
         self.MAX_DROPPED = 10
 
+        # mean patience time in ms of customers in systems with reneging
+        self.MEAN_PATIENCE = 2000
+
         # set seed for random number generation
         self.SEED = 3755457
         self.SEED_IAT = 0
         self.SEED_ST = 1
+        self.SEED_PATIENCE = 2
 
         # set desired utilization (rho)
         self.RHO = .5
@@ -1,3 +1,16 @@
+import numpy
+
+# fields of SimResult, that are stored in columnar result tables
+RESULT_DTYPE = numpy.dtype([('system_utilization', float),
+                            ('mean_waiting_time', float),
+                            ('mean_queue_length', float),
+                            ('blocking_probability', float),
+                            ('packets_dropped', int),
+                            ('packets_served', int),
+                            ('packets_total', int),
+                            ('warmup_time', float)])
+
+
 class SimResult(object):
     """
     SimResults gathers all simulation results that are generated during the simulation.
@@ -16,9 +29,17 @@ class SimResult(object):
         self.packets_dropped = 0
         self.packets_served = 0
         self.packets_total = 0
+        self.packets_reneged = 0
         self.mean_waiting_time = 0
         self.mean_queue_length = 0
         self.blocking_probability = 0
+        self.events_processed = 0
+        self.event_throughput = 0
+        self.warmup_time = 0
+        self.warmup_packets = 0
+        self.truncation_time = 0
+        # name of the engine, that has produced the results, e.g., MarkovChainEngine
+        self.engine = 'Simulation'
 
     def gather_results(self):
         """
@@ -32,9 +53,17 @@ class SimResult(object):
             # print('counter_collection not available for getting simulation results.')
             pass
         self.packets_dropped = self.sim.sim_state.num_blocked_packets
-        self.packets_served = self.sim.sim_state.num_packets - self.sim.sim_state.num_blocked_packets
+        self.packets_served = self.sim.sim_state.num_packets - self.sim.sim_state.num_blocked_packets - \
+            self.sim.sim_state.num_reneged_packets
         self.packets_total = self.sim.sim_state.num_packets
+        self.packets_reneged = self.sim.sim_state.num_reneged_packets
         self.blocking_probability = self.sim.sim_state.get_blocking_probability()
+        self.events_processed = self.sim.event_chain.num_removed
+        self.event_throughput = self.sim.event_chain.get_throughput(self.sim.wall_time)
+        self.warmup_time = self.sim.sim_state.warmup_time
+        self.warmup_packets = self.sim.sim_state.warmup_packets
+        self.truncation_time = self.sim.sim_state.truncation_time
+        self.engine = 'Simulation'
 
     def update(self):
         """
@@ -47,6 +76,40 @@ class SimResult(object):
         self.packets_dropped = 0
         self.packets_served = 0
         self.packets_total = 0
+        self.packets_reneged = 0
         self.mean_waiting_time = 0
         self.mean_queue_length = 0
         self.blocking_probability = 0
+        self.events_processed = 0
+        self.event_throughput = 0
+        self.warmup_time = 0
+        self.warmup_packets = 0
+        self.truncation_time = 0
+        self.engine = 'Simulation'
+
+    def to_record(self):
+        """
+        :return: tuple of the result fields in the order of RESULT_DTYPE
+        """
+        return tuple(getattr(self, name) for name in RESULT_DTYPE.names)
+
+    @staticmethod
+    def from_record(record):
+        """
+        Create a SimResult object, that is not attached to a simulation, from a row of a result table.
+        :param record: row of a structured array with dtype RESULT_DTYPE
+        :return: SimResult object
+        """
+        result = SimResult(None)
+        for name in RESULT_DTYPE.names:
+            setattr(result, name, record[name].item())
+        return result
+
+
+def make_result_table(results):
+    """
+    Collect SimResult objects in a columnar result table.
+    :param results: iterable of SimResult objects
+    :return: numpy structured array with dtype RESULT_DTYPE, one row per result
+    """
+    return numpy.array([r.to_record() for r in results], dtype=RESULT_DTYPE)
@@ -3,8 +3,12 @@ class SimState(object):
     """
     SimState contains the basic simulation state.
 
-    It contains the current time and a stop flag, indicating whether the simulation is still running.
+    It contains the current time and a stop flag, indicating whether the simulation is still running. The finished
+    flag indicates, that the termination event has been processed, i.e., a stopped run can not be continued.
     Furthermore, it contains the number of blocked (dropped) packets and the number of total packets.
+    Packets, that leave the queue before being served, are counted as reneged packets.
+    If the warm-up period is deleted, the counters and the packet counts start at warmup_time, when the end of the
+    warm-up period has been detected. The MSER truncation point truncation_time is only kept as a diagnostic.
     """
 
     def __init__(self):
@@ -13,8 +17,13 @@ class SimState(object):
         """
         self.now = 0
         self.stop = False
+        self.finished = False
         self.num_packets = 0
         self.num_blocked_packets = 0
+        self.num_reneged_packets = 0
+        self.warmup_time = 0
+        self.warmup_packets = 0
+        self.truncation_time = 0
 
     def packet_accepted(self):
         """
@@ -29,9 +38,17 @@ class SimState(object):
         self.num_packets += 1
         self.num_blocked_packets += 1
 
+    def packet_reneged(self):
+        """
+        Count a packet that has left the queue without being served.
+        """
+        self.num_reneged_packets += 1
+
     def get_blocking_probability(self):
         """
         Get the blocking probability throughout the simulation.
         :return: blocking probability of the system
         """
+        if self.num_packets == 0:
+            return 0.
         return float(self.num_blocked_packets) / float(self.num_packets)
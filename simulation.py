@@ -1,80 +1,118 @@
+import time
+
+import numpy
+
 from simstate import SimState
-from systemstate import SystemState
-from event import EventChain, CustomerArrival, SimulationTermination
+from systemstate import SystemState, RenegingSystemState
+from event import EventChain, CustomerArrival, ServiceCompletion, SimulationTermination, SimulationPause
+from event import RenegingCustomerArrival
 from simresult import SimResult
 from simparam import SimParam
 from countercollection import CounterCollection
+from batchmeans import BatchMeans
+from regenerative import RegenerativeEstimator
+from objectpool import ObjectPool
 
 
-from rng import RNG, ExponentialRNS, UniformRNS
+from rng import RNG, ExponentialRNS, UniformRNS, BlockExponentialRNS, substream
 
 
 class Simulation(object):
 
-    def __init__(self, sim_param=SimParam(), no_seed=False):
+    # classes of the system state and of the first customer arrival, can be changed in subclasses
+    system_state_class = SystemState
+    arrival_class = CustomerArrival
+
+    def __init__(self, sim_param=None, no_seed=False, event_chain_class=EventChain, pooling=False,
+                 warmup_detection=False, warm_start=False, block_rns=False, replication=None):
         """
         Initialize the Simulation object.
-        :param sim_param: is an optional SimParam object for parameter pre-configuration
+        Every simulation owns its parameters, RNG streams, counters and object pool, so that simulations can run
+        concurrently in threads or processes without sharing state.
+        :param sim_param: is an optional SimParam object for parameter pre-configuration. If it is not given, the
+        simulation creates its own SimParam object.
         :param no_seed: is an optional parameter. If it is set to True, the RNG should be initialized without a
         a specific seed.
+        :param event_chain_class: is an optional event chain backend, e.g., CalendarEventChain for models with many
+        pending events. Defaults to the binary heap EventChain.
+        :param pooling: is an optional parameter. If it is set to True, processed events and completed packets are
+        recycled by the object pool of the simulation.
+        :param warmup_detection: is an optional parameter. If it is set to True, the end of the warm-up period is
+        detected with MSER-5 during the run and the counters only count afterwards (see WarmupDetector).
+        :param warm_start: is an optional parameter. If it is set to True, every run starts with a system state sampled
+        from the stationary distribution of M/M/1/S instead of an empty system (see SystemState.warm_start).
+        :param block_rns: is an optional parameter. If it is set to True, the exponential random numbers are drawn in
+        blocks from NumPy Generators (BlockExponentialRNS) instead of random.Random.
+        :param replication: is an optional index of a replication. If it is given, every RNS is seeded with an
+        independent substream of sim_param.SEED for this replication (see rng.substream) instead of the fixed seeds
+        SEED_IAT and SEED_ST, hence replications can be run in any order or on different workers.
         """
-        self.sim_param = sim_param
+        self.sim_param = SimParam() if sim_param is None else sim_param
+        self.warmup_detection = warmup_detection
+        self.warm_start = warm_start
+        self.event_chain_class = event_chain_class
+        self.pool = ObjectPool(pooling)
         self.sim_state = SimState()
-        self.system_state = SystemState(self)
-        self.event_chain = EventChain()
+        self.system_state = self.system_state_class(self)
+        self.event_chain = event_chain_class()
         self.sim_result = SimResult(self)
         self.counter_collection = CounterCollection(self)
+        self.wall_time = 0.
+
+        self.rns_class = BlockExponentialRNS if block_rns else ExponentialRNS
+        self.no_seed = no_seed
+        self.init_rng(replication)
+
+    def init_rng(self, replication=None):
+        """
+        Create new random number streams, e.g., for switching to another replication.
+        :param replication: optional index of the replication, see __init__
+        """
+        self.replication = replication
+        self.rng = RNG(self.rns_class(1., self.get_seed('iat')),
+                       self.rns_class(1. / float(self.sim_param.RHO), self.get_seed('st')))
+        # the initial states of warm starts are drawn from their own stream, so that the arrivals are not shifted
+        self.warm_start_generator = numpy.random.default_rng(self.get_seed('warmstart')) if self.warm_start else None
 
-        if no_seed:
-            self.rng = RNG(ExponentialRNS(1.), ExponentialRNS(1. / float(self.sim_param.RHO)))
-        else:
-            self.rng = RNG(ExponentialRNS(1., self.sim_param.SEED_IAT),
-                           ExponentialRNS(1. / float(self.sim_param.RHO), self.sim_param.SEED_ST))
+    def get_seed(self, kind):
+        """
+        Return the seed of a random number stream.
+        :param kind: kind of the stream, one of rng.STREAM_KINDS
+        :return: None if no_seed is set, the substream of the replication if it is set, else the fixed seed of
+        sim_param (SEED_IAT, SEED_ST or SEED_PATIENCE). Streams without a fixed seed in sim_param (e.g. the jumps of
+        the MarkovChainEngine or the initial states of warm starts) use the substream of replication 0 in this case.
+        """
+        if self.no_seed:
+            return None
+        if self.replication is None and hasattr(self.sim_param, 'SEED_' + kind.upper()):
+            return getattr(self.sim_param, 'SEED_' + kind.upper())
+        return substream(self.sim_param.SEED, self.replication or 0, kind)
 
     def reset(self):
         """
         Reset the Simulation object.
         """
         self.sim_state = SimState()
-        self.system_state = SystemState(self)
-        self.event_chain = EventChain()
+        self.system_state = self.system_state_class(self)
+        self.event_chain = self.event_chain_class()
         self.sim_result = SimResult(self)
         self.counter_collection = CounterCollection(self)
+        self.wall_time = 0.
         self.rng.iat_rns.set_parameters(1.)
         self.rng.st_rns.set_parameters(1. / float(self.sim_param.RHO))
 
-    def do_simulation(self):
+    def do_simulation(self, checkpointer=None):
         """
         Do one simulation run. Initialize simulation and create first and last event.
         After that, one after another event is processed.
+        :param checkpointer: is an optional Checkpointer, that writes checkpoints of the run periodically
         :return: SimResult object
         """
         # insert first and last event
-        self.event_chain.insert(CustomerArrival(self, 0))
+        self.insert_first_events()
         self.event_chain.insert(SimulationTermination(self, self.sim_param.SIM_TIME))
 
-        # start simulation (run)
-        while not self.sim_state.stop:
-
-            # get next simevent from events
-            e = self.event_chain.remove_oldest_event()
-            if e:
-                # if event exists and timestamps are ok, process the event
-                if self.sim_state.now <= e.timestamp:
-                    self.sim_state.now = e.timestamp
-                    self.counter_collection.count_queue()
-                    e.process()
-                else:
-                    print('NOW: ' + str(self.sim_state.now) + ', EVENT TIMESTAMP: ' + str(e.timestamp))
-                    raise RuntimeError("ERROR: TIMESTAMP OF EVENT IS SMALLER THAN CURRENT TIME.")
-
-            else:
-                print('Event chain is empty. Abort')
-                self.sim_state.stop = True
-
-        # gather results for sim_result object
-        self.sim_result.gather_results()
-        return self.sim_result
+        return self.run(predicate=checkpointer)
 
     def do_simulation_n_limit(self, n, new_batch=False):
         """
@@ -82,39 +120,261 @@ class Simulation(object):
         Do one simulation run. Initialize simulation and create first event.
         After that, one after another event is processed.
         :param n: number of customers, that are processed before the simulation stops
+        :param new_batch: continue the current run without inserting a first event. For batch means, use
+        do_simulation_batch_means instead.
         :return: SimResult object
         """
         # insert first event only if no new batch has been started
         if not new_batch:
-            self.event_chain.insert(CustomerArrival(self, 0))
+            self.insert_first_events()
 
-        cnt_served_packets = 0
-        # start simulation (run)
-        while not self.sim_state.stop:
+        # the simulation stops after the first service completion exceeding n
+        return self.run(served_packets=n + 1)
 
-            # get next simevent from events
-            e = self.event_chain.remove_oldest_event()
-            if e:
-                # if event exists and timestamps are ok, process the event
-                if self.sim_state.now <= e.timestamp:
-                    self.sim_state.now = e.timestamp
-                    self.counter_collection.count_queue()
-                    e.process()
-
-                    # if this event is a service completion event
-                    if e.priority == 0:
-                        cnt_served_packets += 1
-                        if cnt_served_packets > n:
-                            self.sim_state.stop = True
-
-                else:
-                    print('NOW: ' + str(self.sim_state.now) + ', EVENT TIMESTAMP: ' + str(e.timestamp))
-                    raise RuntimeError("ERROR: TIMESTAMP OF EVENT IS SMALLER THAN CURRENT TIME.")
+    def do_simulation_batch_means(self, batch_size, **kwargs):
+        """
+        Do one long simulation run, that is divided into batches of batch_size served packets.
+        The batch means are collected without resetting the model state between batches, and the run stops as soon as
+        the confidence intervals of the requested metrics are small enough (see BatchMeans for the parameters).
+        The collector is available as counter_collection.batch_means after the run.
+        :param batch_size: number of served packets per batch
+        :param kwargs: optional parameters of BatchMeans, e.g., relative={'mean_waiting_time': .05} or grow=True
+        :return: SimResult object of the whole run
+        """
+        self.counter_collection.set_collector('batch_means', BatchMeans(self, batch_size, **kwargs))
+        self.insert_first_events()
+        return self.run()
+
+    def do_simulation_regenerative(self, **kwargs):
+        """
+        Do one simulation run, that is divided into regeneration cycles (the server becomes idle with an empty queue).
+        The run stops as soon as the confidence intervals of the requested metrics are small enough (see
+        RegenerativeEstimator for the parameters). The estimator is available as counter_collection.regenerative
+        after the run.
+        :param kwargs: optional parameters of RegenerativeEstimator, e.g., relative={'mean_waiting_time': .05}
+        :return: SimResult object of the whole run
+        """
+        self.counter_collection.set_collector('regenerative', RegenerativeEstimator(self, **kwargs))
+        self.insert_first_events()
+        return self.run()
+
+    def insert_first_events(self):
+        """
+        Insert the first customer arrival at time 0.
+        In case of a warm start, the initial system state is sampled and the first customer arrives after an
+        inter-arrival time instead. If a packet is in service, its service completion is inserted as well. Due to the
+        memoryless inter-arrival and service times, the remaining times are new inter-arrival and service times.
+        """
+        acquire = self.pool.acquire
+        if not self.warm_start:
+            self.event_chain.insert(acquire(self.arrival_class, self, 0))
+            return
+        if self.system_state.warm_start():
+            self.event_chain.insert(acquire(ServiceCompletion, self, self.rng.get_st() * 1000))
+        self.event_chain.insert(acquire(self.arrival_class, self, self.rng.get_iat() * 1000))
+
+    def run_until(self, t):
+        """
+        Run the simulation until time t. All events up to (and including) time t are processed and the simulation time
+        is set to t. The pause is not counted as an event and the counters are not updated at t, so that all counts
+        are the same as in an uninterrupted run. The run can be continued afterwards, e.g., by another call of
+        run_until.
+        If the run has not been started yet, the first events and the termination at SIM_TIME are inserted.
+        :param t: simulation time in ms, not before the current simulation time
+        :return: SimResult object
+        """
+        if self.sim_state.finished:
+            return self.sim_result
+        if t < self.sim_state.now:
+            raise ValueError('The simulation can not be run until ' + str(t) + ', the current simulation time is ' +
+                             str(self.sim_state.now) + '.')
+        self.start_run()
+        self.run(until=t)
+        if not self.sim_state.finished:
+            self.sim_state.stop = False
+        return self.sim_result
+
+    def run_events(self, k):
+        """
+        Process the next k events. The run can be continued afterwards.
+        If the run has not been started yet, the first events and the termination at SIM_TIME are inserted.
+        :param k: number of events
+        :return: SimResult object
+        """
+        if self.sim_state.finished:
+            return self.sim_result
+        self.start_run()
+        self.run(num_events=k)
+        if not self.sim_state.finished:
+            self.sim_state.stop = False
+        return self.sim_result
 
+    def iter_snapshots(self, every=None, every_events=None):
+        """
+        Generator, that runs the simulation and yields snapshots of the results every given simulation time or number
+        of events, until the termination at SIM_TIME. The snapshots are computed from the running sums of the counters
+        in O(1). The consumer can stop early, the simulation can be continued afterwards.
+        :param every: simulation time in ms between two snapshots
+        :param every_events: number of events between two snapshots (if every is not given)
+        :return: generator of SimResult objects, that are detached from the simulation
+        """
+        if every is None and every_events is None:
+            raise ValueError('Either every or every_events has to be given.')
+        t = self.sim_state.now
+        while not self.sim_state.finished:
+            if every is not None:
+                t += every
+                self.run_until(t)
             else:
+                self.run_events(every_events)
+            yield self.get_snapshot()
+
+    def get_snapshot(self):
+        """
+        :return: a new SimResult object with the current results, that is detached from the simulation
+        """
+        result = SimResult(self)
+        result.gather_results()
+        result.sim = None
+        return result
+
+    def start_run(self):
+        """
+        Insert the first events and the termination at SIM_TIME, if no event has been inserted yet.
+        """
+        if self.event_chain.num_inserted == 0:
+            self.insert_first_events()
+            self.event_chain.insert(SimulationTermination(self, self.sim_param.SIM_TIME))
+
+    def run(self, sim_time=None, served_packets=None, wall_clock=None, predicate=None, num_events=None, until=None):
+        """
+        Run kernel of the simulation. Events are taken from the event chain and processed, until the stop flag in
+        SimState is set or one of the given stop conditions holds. The first event (and the termination event, if
+        needed) has to be in the event chain already.
+        Without stop conditions, a loop is used, that only checks the stop flag, since it runs for every event.
+        :param sim_time: stop after the first event with a timestamp larger or equal to sim_time (in ms)
+        :param served_packets: stop after the given number of service completions in this run
+        :param wall_clock: stop after the given wall-clock budget (in seconds) is used up
+        :param predicate: callable, that is called with the simulation after every event. Stop if it returns True.
+        :param num_events: stop after the given number of events in this run
+        :param until: pause at this simulation time (in ms) after all events up to it (see run_until)
+        :return: SimResult object
+        """
+        # bind frequently used objects and methods locally
+        sim_state = self.sim_state
+        remove_oldest_event = self.event_chain.remove_oldest_event
+        count_queue = self.counter_collection.count_queue
+        release = self.pool.release if self.pool.enabled else None
+        perf_counter = time.perf_counter
+        start = perf_counter()
+
+        if sim_time is None and served_packets is None and wall_clock is None and predicate is None and \
+                num_events is None and until is None:
+            while not sim_state.stop:
+                try:
+                    e = remove_oldest_event()
+                except IndexError:
+                    print('Event chain is empty. Abort')
+                    sim_state.stop = True
+                    break
+                timestamp = e.timestamp
+                if timestamp < sim_state.now:
+                    print('NOW: ' + str(sim_state.now) + ', EVENT TIMESTAMP: ' + str(timestamp))
+                    raise RuntimeError("ERROR: TIMESTAMP OF EVENT IS SMALLER THAN CURRENT TIME.")
+                sim_state.now = timestamp
+                count_queue()
+                e.process()
+                if release is not None:
+                    release(e)
+            self.wall_time += perf_counter() - start
+            self.sim_result.gather_results()
+            return self.sim_result
+
+        served = 0
+        events = 0
+        deadline = None if wall_clock is None else start + wall_clock
+        pause = None if until is None else self.event_chain.insert(SimulationPause(self, until))
+
+        # start simulation (run)
+        while not sim_state.stop:
+
+            # get next simevent from events
+            try:
+                e = remove_oldest_event()
+            except IndexError:
                 print('Event chain is empty. Abort')
-                self.sim_state.stop = True
+                sim_state.stop = True
+                break
+
+            # if timestamps are ok, process the event
+            timestamp = e.timestamp
+            if timestamp < sim_state.now:
+                print('NOW: ' + str(sim_state.now) + ', EVENT TIMESTAMP: ' + str(timestamp))
+                raise RuntimeError("ERROR: TIMESTAMP OF EVENT IS SMALLER THAN CURRENT TIME.")
+            sim_state.now = timestamp
+            if e is pause:
+                # the pause is not an event of the model, hence the counters are not updated
+                pause = None
+                sim_state.stop = True
+                break
+            count_queue()
+            e.process()
+
+            # check the stop conditions
+            if type(e) is ServiceCompletion:
+                served += 1
+                if served_packets is not None and served >= served_packets:
+                    sim_state.stop = True
+            if sim_time is not None and timestamp >= sim_time:
+                sim_state.stop = True
+            if deadline is not None and perf_counter() >= deadline:
+                sim_state.stop = True
+            if predicate is not None and predicate(self):
+                sim_state.stop = True
+            if num_events is not None:
+                events += 1
+                if events >= num_events:
+                    sim_state.stop = True
+
+            if release is not None:
+                release(e)
+
+        if pause is not None:
+            # the run has stopped before the pause, e.g., at the termination
+            self.event_chain.cancel(pause)
+        self.wall_time += perf_counter() - start
 
         # gather results for sim_result object
         self.sim_result.gather_results()
         return self.sim_result
+
+
+class RenegingSimulation(Simulation):
+    """
+    Simulation of a system with impatient customers, that leave the queue after an exponentially distributed
+    patience time with mean sim_param.MEAN_PATIENCE (in ms).
+    """
+
+    system_state_class = RenegingSystemState
+    arrival_class = RenegingCustomerArrival
+
+    def __init__(self, sim_param=None, no_seed=False, **kwargs):
+        """
+        Initialize the Simulation object and the RNS for the patience times.
+        The parameters are the same as for Simulation.
+        """
+        super(RenegingSimulation, self).__init__(sim_param, no_seed, **kwargs)
+
+    def init_rng(self, replication=None):
+        """
+        Create new random number streams including the RNS for the patience times.
+        """
+        super(RenegingSimulation, self).init_rng(replication)
+        self.rng.set_patience_rns(self.rns_class(1. / float(self.sim_param.MEAN_PATIENCE), self.get_seed('patience')))
+
+    def reset(self):
+        """
+        Reset the Simulation object.
+        """
+        super(RenegingSimulation, self).reset()
+        self.rng.patience_rns.set_parameters(1. / float(self.sim_param.MEAN_PATIENCE))
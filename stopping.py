@@ -0,0 +1,128 @@
+class PrecisionStoppingRule(object):
+    """
+    Stopping rule for the precision of confidence intervals.
+
+    A metric meets its precision if the half width of its confidence interval is at most its absolute precision or at
+    most its relative precision times the absolute value of its mean. The rule is met if all requested metrics meet
+    their precision after at least min_samples samples, or if max_samples samples are reached.
+
+    Subclasses provide the dictionary estimates of running estimates (SequentialEstimate or RatioEstimate) per metric.
+    """
+
+    # metrics, for which estimates are available, or None if any metric can be requested
+    metrics = None
+    # name of the estimates in error messages
+    estimate_type = 'estimate'
+
+    def init_rule(self, sim_param, absolute, relative, alpha):
+        """
+        Validate and set the precisions of the stopping rule.
+        :param sim_param: simulation parameters, which give the defaults of absolute and alpha
+        :param absolute: dictionary of absolute precisions per metric,
+        default: {'blocking_probability': sim_param.EPSILON} if relative is not given either
+        :param relative: dictionary of relative precisions per metric, e.g., {'mean_waiting_time': .05}
+        :param alpha: significance level of the confidence intervals (default: sim_param.ALPHA)
+        """
+        if absolute is None and relative is None:
+            absolute = {'blocking_probability': sim_param.EPSILON}
+        if self.metrics is not None:
+            for name in list(absolute or {}) + list(relative or {}):
+                if name not in self.metrics:
+                    raise ValueError('No ' + self.estimate_type + ' available for ' + str(name) + '.')
+        self.absolute = absolute or {}
+        self.relative = relative or {}
+        self.alpha = sim_param.ALPHA if alpha is None else alpha
+
+    def get_requested_metrics(self):
+        """
+        :return: list of the metrics with an absolute or relative precision, in the order of the dictionaries
+        """
+        return list(self.absolute) + [name for name in self.relative if name not in self.absolute]
+
+    def get_half_width(self, name):
+        """
+        :param name: name of the metric
+        :return: half width of the confidence interval of the metric
+        """
+        return self.estimates[name].get_half_width(self.alpha)
+
+    def is_precise(self, name):
+        """
+        Check the precision of a single metric.
+        :param name: name of the metric
+        :return: true, if the metric meets its absolute or relative precision
+        """
+        half_width = self.get_half_width(name)
+        if name in self.absolute and half_width <= self.absolute[name]:
+            return True
+        return name in self.relative and half_width <= self.relative[name] * abs(self.estimates[name].get_mean())
+
+    def is_met(self, n, min_samples, max_samples):
+        """
+        Check the stopping rule.
+        :param n: number of samples (e.g., batches, cycles or replications)
+        :param min_samples: minimum number of samples before the precision is checked
+        :param max_samples: the rule is met after this number of samples, even if the precision is not met
+        :return: true, if all requested metrics meet their precision or max_samples is reached
+        """
+        if n >= max_samples:
+            return True
+        if n < min_samples:
+            return False
+        return all(self.is_precise(name) for name in self.get_requested_metrics())
+
+    def report_estimates(self, title):
+        """
+        Print the estimates and their confidence intervals.
+        :param title: first line of the report
+        """
+        print(title + ' (alpha = ' + str(self.alpha) + '):')
+        for name, estimate in self.estimates.items():
+            print('\t' + name + ': mean = ' + str(estimate.get_mean()) + ', half width = ' +
+                  str(self.get_half_width(name)))
+
+
+class PeriodEstimator(PrecisionStoppingRule):
+    """
+    Base class of estimators, that divide a single run into periods (batches or regeneration cycles).
+
+    Per period, only a few sums are accumulated: arrivals, blocked packets, served packets, waiting times, and the
+    time integrals of the queue length and of the server status.
+    """
+
+    # metrics, for which estimates are available (names of the SimResult fields)
+    metrics = ('blocking_probability', 'mean_waiting_time', 'system_utilization', 'mean_queue_length')
+
+    def start_period(self):
+        """
+        Start a new period at the current simulation time.
+        """
+        sim_state = self.sim.sim_state
+        self.start_time = sim_state.now
+        self.last_timestamp = sim_state.now
+        self.start_packets = sim_state.num_packets
+        self.start_blocked = sim_state.num_blocked_packets
+        self.served = 0
+        self.sum_wt = 0.
+        self.area_ql = 0.
+        self.area_busy = 0.
+
+    def count_queue(self, queue_length, server_busy):
+        """
+        Integrate queue length and server status over the time since the last event.
+        Called by CounterCollection.count_queue before an event is processed.
+        """
+        now = self.sim.sim_state.now
+        dt = now - self.last_timestamp
+        self.area_ql += queue_length * dt
+        if server_busy:
+            self.area_busy += dt
+        self.last_timestamp = now
+
+    def count_packet(self, wt):
+        """
+        Count the waiting time of a served packet.
+        Called by CounterCollection.count_packet after a service completion.
+        """
+        self.served += 1
+        self.sum_wt += wt
@@ -0,0 +1,142 @@
+import copy
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy
+
+from counter import TimeIndependentCounter
+from replication import run_replication_batch
+from simresult import RESULT_DTYPE
+
+# parameters, that identify a point of a sweep
+PARAMETER_DTYPE = [('S', 'i8'), ('RHO', 'f8'), ('SIM_TIME', 'f8')]
+
+# one row per point: the parameters, the number of replications, and mean and half width of the confidence interval
+# of every result field (e.g. mean_waiting_time and mean_waiting_time_ci)
+SWEEP_DTYPE = numpy.dtype(PARAMETER_DTYPE + [('replications', 'i8')] +
+                          [(name + suffix, 'f8') for name in RESULT_DTYPE.names for suffix in ('', '_ci')])
+
+
+def make_grid(sim_param, **values):
+    """
+    Create the simulation parameters for all combinations of the given values.
+    Example: make_grid(SimParam(), S=[5, 6, 7], RHO=[.5, .9]) returns six SimParam objects.
+    :param sim_param: simulation parameters, that are copied for every point
+    :param values: lists of values per parameter name
+    :return: list of SimParam objects, the last parameter varies fastest
+    """
+    names = list(values.keys())
+    points = []
+    for combination in itertools.product(*[values[name] for name in names]):
+        point = copy.deepcopy(sim_param)
+        for name, value in zip(names, combination):
+            setattr(point, name, value)
+        points.append(point)
+    return points
+
+
+class ParameterSweep(object):
+    """
+    Runs independent replications for every point of a parameter sweep.
+
+    Every (point, replication) job gets its own copy of the simulation parameters, so no simulation state is shared
+    and the jobs can be distributed over a pool of worker processes. The seeds of a replication only depend on its
+    index (see rng.substream), hence replication i uses the same random numbers at every point (common random
+    numbers), which reduces the variance of differences between points.
+
+    Results stream back per point as soon as all replications of the point have finished. They are summarized in a
+    result table (structured array with dtype SWEEP_DTYPE), which can be passed to pandas.DataFrame if needed.
+    """
+
+    def __init__(self, points, replications, max_workers=None, engine=None, batch_size=None, alpha=0.05):
+        """
+        Initialize the sweep.
+        :param points: list of SimParam objects, e.g., from make_grid
+        :param replications: number of replications per point
+        :param max_workers: number of worker processes (default: number of CPUs). With max_workers=1, all jobs are
+        run in the calling process.
+        :param engine: optional engine factory, see run_replication (default: the event based simulation)
+        :param batch_size: number of replications per task (default: chosen from the number of jobs)
+        :param alpha: significance level of the confidence intervals
+        """
+        self.points = points
+        self.replications = replications
+        self.max_workers = max_workers
+        self.engine = engine
+        self.batch_size = batch_size
+        self.alpha = alpha
+        self.results = {}
+
+    def iter_points(self):
+        """
+        Run all jobs and yield the points in the order in which they finish.
+        The SimResult objects of a finished point are stored in self.results as well.
+        :return: generator of (index of the point, list of SimResult objects ordered by replication)
+        """
+        indices = list(range(self.replications))
+        if self.max_workers == 1:
+            for i, point in enumerate(self.points):
+                self.results[i] = run_replication_batch(point, indices, self.engine)
+                yield i, self.results[i]
+            return
+
+        batch_size = self.batch_size
+        if batch_size is None:
+            num_jobs = len(self.points) * self.replications
+            batch_size = max(1, min(self.replications, num_jobs // (4 * (self.max_workers or os.cpu_count() or 1))))
+        batches = [indices[j:j + batch_size] for j in range(0, self.replications, batch_size)]
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {}
+            for i, point in enumerate(self.points):
+                for batch in batches:
+                    futures[executor.submit(run_replication_batch, point, batch, self.engine)] = (i, batch[0])
+            partial = {}
+            for future in as_completed(futures):
+                i, first = futures[future]
+                partial.setdefault(i, {})[first] = future.result()
+                if len(partial[i]) == len(batches):
+                    batch_results = partial.pop(i)
+                    self.results[i] = [r for first in sorted(batch_results) for r in batch_results[first]]
+                    yield i, self.results[i]
+
+    def iter_summaries(self):
+        """
+        Run all jobs and yield a summary row (see summarize) for every point as soon as it has finished.
+        :return: generator of (index of the point, row of the result table)
+        """
+        for i, results in self.iter_points():
+            yield i, self.summarize(self.points[i], results)
+
+    def run(self):
+        """
+        Run all jobs and collect the summaries of all points.
+        :return: result table with dtype SWEEP_DTYPE, one row per point in the order of self.points
+        """
+        table = numpy.zeros(len(self.points), dtype=SWEEP_DTYPE)
+        for i, row in self.iter_summaries():
+            table[i] = row
+        return table
+
+    def summarize(self, point, results):
+        """
+        Compute mean and half width of the confidence interval of every result field for one point.
+        :param point: SimParam object of the point
+        :param results: list of SimResult objects of the replications
+        :return: row of the result table (structured scalar with dtype SWEEP_DTYPE)
+        """
+        row = numpy.zeros((), dtype=SWEEP_DTYPE)
+        for name, _ in PARAMETER_DTYPE:
+            row[name] = getattr(point, name)
+        row['replications'] = len(results)
+        for name in RESULT_DTYPE.names:
+            cnt = TimeIndependentCounter(name=name)
+            for result in results:
+                cnt.count(getattr(result, name))
+            row[name] = cnt.get_mean()
+            if len(results) > 1:
+                row[name + '_ci'] = cnt.report_confidence_interval(self.alpha, print_report=False)
+            else:
+                row[name + '_ci'] = numpy.nan
+        return row
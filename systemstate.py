@@ -1,5 +1,9 @@
+import numpy
+
 from finitequeue import FiniteQueue
+from markovchain import stationary_distribution
 from packet import Packet
+from event import Reneging
 
 
 class SystemState(object):
@@ -29,6 +33,7 @@ class SystemState(object):
         self.served_packet = None
         self.sim = sim
         self.last_arrival = 0
+        self.num_initial_packets = 0
 
     def add_packet_to_server(self):
         """
@@ -39,8 +44,11 @@ class SystemState(object):
             return False
         else:
             self.server_busy = True
-            self.served_packet = Packet(self.sim, self.sim.sim_state.now - self.last_arrival)
-            self.last_arrival = self.sim.sim_state.now
+            sim = self.sim
+            now = sim.sim_state.now
+            iat = now - self.last_arrival
+            self.served_packet = sim.pool.acquire(Packet, sim, iat) if sim.pool.enabled else Packet(sim, iat)
+            self.last_arrival = now
             self.served_packet.start_service()
             return True
 
@@ -49,11 +57,15 @@ class SystemState(object):
         Try to add a packet to the buffer.
         :return: True if buffer/queue is not full and packet has been added successfully.
         """
-        if self.buffer.add(Packet(self.sim, self.sim.sim_state.now - self.last_arrival)):
-            self.last_arrival = self.sim.sim_state.now
+        sim = self.sim
+        now = sim.sim_state.now
+        iat = now - self.last_arrival
+        packet = sim.pool.acquire(Packet, sim, iat) if sim.pool.enabled else Packet(sim, iat)
+        self.last_arrival = now
+        if self.buffer.add(packet):
             return True
         else:
-            self.last_arrival = self.sim.sim_state.now
+            sim.pool.release(packet)
             return False
 
     def complete_service(self):
@@ -63,7 +75,11 @@ class SystemState(object):
         self.server_busy = False
         p = self.served_packet
         p.complete_service()
-        self.sim.counter_collection.count_packet(p)
+        if self.num_initial_packets > 0:
+            # packets of a warm start have arrived before the run, their waiting times are not known
+            self.num_initial_packets -= 1
+        else:
+            self.sim.counter_collection.count_packet(p)
         self.served_packet = None
         return p
 
@@ -80,9 +96,109 @@ class SystemState(object):
             self.server_busy = True
             return True
 
+    def warm_start(self):
+        """
+        Initialize the system state with a number of packets sampled from the stationary distribution of M/M/1/S.
+        If the system is not empty, the first packet is in service and the others wait in the buffer.
+        The initial packets are not counted as arrivals and their waiting times are not counted, so that all
+        statistics are unbiased from time zero for exponential inter-arrival and service times.
+        The number of packets is drawn from the warm start stream of the simulation, so that the inter-arrival times
+        are the same as in a run without warm start.
+        The caller has to schedule the service completion of the packet in service (see Simulation.do_simulation).
+        :return: True if a packet is in service
+        """
+        sim = self.sim
+        cdf = numpy.cumsum(stationary_distribution(sim.sim_param.RHO, sim.sim_param.S))
+        u = sim.warm_start_generator.random()
+        n = min(int(numpy.searchsorted(cdf, u, side='right')), sim.sim_param.S + 1)
+        self.num_initial_packets = n
+        if n == 0:
+            return False
+        self.add_packet_to_server()
+        for _ in range(n - 1):
+            self.buffer.add(sim.pool.acquire(Packet, sim, 0))
+        return True
+
     def get_queue_length(self):
         """
         Return the current buffer content.
         :return: Fill status of the buffer
         """
         return self.buffer.get_queue_length()
+
+
+class RenegingSystemState(SystemState):
+    """
+    System state with impatient customers.
+
+    Every packet, that is added to the queue, gets a patience time from the patience RNS of the simulation.
+    A Reneging event is scheduled for the end of the patience time. If the service of the packet starts before,
+    the Reneging event is cancelled, otherwise the packet leaves the queue without being served.
+    """
+
+    def __init__(self, sim):
+        """
+        Create a system state object with impatient customers
+        :param sim: simulation object, the system state belongs to
+        :return: system_state object
+        """
+        super(RenegingSystemState, self).__init__(sim)
+        self.reneging_events = {}
+
+    def add_packet_to_queue(self):
+        """
+        Try to add a packet to the buffer and schedule its Reneging event.
+        :return: True if buffer/queue is not full and packet has been added successfully.
+        """
+        sim = self.sim
+        packet = sim.pool.acquire(Packet, sim, sim.sim_state.now - self.last_arrival)
+        self.last_arrival = sim.sim_state.now
+        if self.buffer.add(packet):
+            self.schedule_reneging(packet)
+            return True
+        else:
+            sim.pool.release(packet)
+            return False
+
+    def schedule_reneging(self, packet):
+        """
+        Schedule the Reneging event of a packet in the queue at the end of its patience time.
+        :param packet: the waiting packet
+        """
+        sim = self.sim
+        ev = sim.pool.acquire(Reneging, sim, sim.sim_state.now + sim.rng.get_patience(), packet)
+        self.reneging_events[packet] = sim.event_chain.insert(ev)
+
+    def warm_start(self):
+        """
+        Initialize the system state from the stationary distribution (see SystemState.warm_start). Every packet, that
+        waits in the queue, gets a patience time from the start of the run, i.e., a Reneging event is scheduled for it.
+        :return: True if a packet is in service
+        """
+        busy = super(RenegingSystemState, self).warm_start()
+        for packet in self.buffer.buffer:
+            self.schedule_reneging(packet)
+        return busy
+
+    def start_service(self):
+        """
+        If the buffer is not empty, take the next packet from there and serve it.
+        The Reneging event of the packet is cancelled.
+        :return: True if buffer is not empty and a stored packet is being served.
+        """
+        if super(RenegingSystemState, self).start_service():
+            handle = self.reneging_events.pop(self.served_packet, None)
+            if handle is not None:
+                self.sim.event_chain.cancel(handle)
+            return True
+        else:
+            return False
+
+    def renege(self, packet):
+        """
+        Remove a packet, whose patience time has run out, from the buffer.
+        :param packet: the impatient packet
+        """
+        del self.reneging_events[packet]
+        self.buffer.remove_packet(packet)
+        self.sim.pool.release(packet)
@@ -0,0 +1,133 @@
+import numpy
+
+
+def mser(z, min_tail=5):
+    """
+    Compute the MSER statistic of a series of batch means for all truncation points.
+    The statistic of truncation point d is the variance of the remaining batch means divided by their number.
+    :param z: numpy array of batch means
+    :param min_tail: minimum number of remaining batch means
+    :return: numpy array of the MSER statistic for d = 0, ..., len(z) - min_tail
+    """
+    k = len(z)
+    # sums over z[d:], computed by reversed cumulative sums
+    s1 = numpy.cumsum(z[::-1])[::-1][:k - min_tail + 1]
+    s2 = numpy.cumsum((z * z)[::-1])[::-1][:k - min_tail + 1]
+    n = numpy.arange(k, min_tail - 1, -1, dtype=float)
+    return (s2 - s1 * s1 / n) / (n * n)
+
+
+def mser_truncation(z, min_tail=5):
+    """
+    Determine the MSER truncation point of a series of batch means.
+    :param z: numpy array of batch means
+    :param min_tail: minimum number of remaining batch means
+    :return: number of batch means to delete, or None if the minimum lies in the second half (warm-up not over)
+    """
+    if len(z) < 2 * min_tail:
+        return None
+    d = int(numpy.argmin(mser(z, min_tail)))
+    if d > len(z) // 2:
+        return None
+    return d
+
+
+class WarmupDetector(object):
+    """
+    Online warm-up (transient) detection with MSER-5.
+
+    During the run, waiting times and queue lengths are collected in batches of batch_size (5) served packets: the
+    mean waiting time of the batch and the time average of the queue length over the batch. Whenever the number of
+    batches has grown by a factor of check_factor, the MSER truncation point of both series is determined. As soon as
+    it lies in the first half for both series, the warm-up is over: the counters of the simulation are reset, so that
+    they only count the steady state, and the detector removes itself from the CounterCollection.
+
+    The counters can only restart at the time of detection, hence the deleted warm-up period ends there: the time of
+    detection and the number of served packets until then are reported as warmup_time and warmup_packets in SimState
+    and SimResult. The MSER truncation point is at or before the detection and is only reported as a diagnostic
+    (truncation_time).
+    """
+
+    def __init__(self, sim, batch_size=5, min_batches=20, check_factor=1.1):
+        """
+        Initialize the detector.
+        :param sim: the simulation, whose warm-up is detected
+        :param batch_size: number of served packets per batch (5 for MSER-5)
+        :param min_batches: minimum number of batches before the first check
+        :param check_factor: relative growth of the number of batches between two checks
+        """
+        self.sim = sim
+        self.batch_size = batch_size
+        self.min_batches = min_batches
+        self.check_factor = check_factor
+        self.next_check = min_batches
+        self.batch_wt = []
+        self.batch_ql = []
+        self.truncation_time = None
+        self.batch_end_times = []
+        self.start_batch()
+
+    def start_batch(self):
+        """
+        Start a new batch at the current simulation time.
+        """
+        self.start_time = self.sim.sim_state.now
+        self.last_timestamp = self.start_time
+        self.served = 0
+        self.sum_wt = 0.
+        self.area_ql = 0.
+
+    def count_queue(self, queue_length, server_busy):
+        """
+        Integrate the queue length over the time since the last event. The server status is not used.
+        Called by CounterCollection.count_queue before an event is processed.
+        """
+        now = self.sim.sim_state.now
+        self.area_ql += queue_length * (now - self.last_timestamp)
+        self.last_timestamp = now
+
+    def count_packet(self, wt):
+        """
+        Count the waiting time of a served packet and complete the batch, if it is full.
+        Called by CounterCollection.count_packet after a service completion.
+        """
+        self.served += 1
+        self.sum_wt += wt
+        if self.served >= self.batch_size:
+            now = self.sim.sim_state.now
+            self.batch_wt.append(self.sum_wt / self.served)
+            self.batch_ql.append(self.area_ql / (now - self.start_time) if now > self.start_time else 0.)
+            self.batch_end_times.append(now)
+            if len(self.batch_wt) >= self.next_check:
+                self.check()
+            self.start_batch()
+
+    def check(self):
+        """
+        Determine the truncation point and end the warm-up period, if it has been found.
+        """
+        self.next_check = int(len(self.batch_wt) * self.check_factor) + 1
+        d_wt = mser_truncation(numpy.array(self.batch_wt))
+        d_ql = mser_truncation(numpy.array(self.batch_ql))
+        if d_wt is None or d_ql is None:
+            return
+        d = max(d_wt, d_ql)
+        self.truncation_time = self.batch_end_times[d - 1] if d > 0 else 0
+        self.end_warmup(d)
+
+    def end_warmup(self, d):
+        """
+        Store the deleted warm-up period and reset the counters and the packet counts of the simulation, so that they
+        only count after the warm-up period.
+        :param d: number of batches before the truncation point
+        """
+        sim = self.sim
+        sim_state = sim.sim_state
+        sim_state.warmup_time = sim_state.now
+        sim_state.warmup_packets = len(self.batch_wt) * self.batch_size
+        sim_state.truncation_time = self.truncation_time
+        sim_state.num_packets = 0
+        sim_state.num_blocked_packets = 0
+        sim_state.num_reneged_packets = 0
+        sim.counter_collection.reset()
+        sim.counter_collection.set_collector('warmup', None)